@@ -1,6 +1,15 @@
 import os
+import sys
 from pathlib import Path
 
+import pytest
+
+# Repository root, computed once; test-directory conftests and test modules rely on
+# this instead of each inserting their own (possibly duplicate) sys.path entry.
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
 # Files to ignore during collection (previously in pytest.ini as collect_ignore)
 _IGNORED = {
     str(Path('test') / 'test_basic.py'),
@@ -17,3 +26,17 @@ def pytest_ignore_collect(collection_path, config):
     except Exception:
         rel = str(collection_path)
     return rel in _IGNORED
+
+
+def pytest_collection_modifyitems(config, items):
+    """Pre-load Whisper for tests marked `needs_whisper`, wherever they live."""
+    for item in items:
+        if item.get_closest_marker('needs_whisper') and '_warm_whisper' not in item.fixturenames:
+            item.fixturenames.append('_warm_whisper')
+
+
+@pytest.fixture(scope='session')
+def _warm_whisper():
+    """Load the Whisper 'base' model once per session; later loads hit the module cache."""
+    vae = pytest.importorskip('vid2doc.video_audio_extraction')
+    return vae._load_whisper_model('base')
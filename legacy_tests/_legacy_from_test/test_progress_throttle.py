@@ -1,6 +1,6 @@
 import time
 import threading
-from vid2doc.app import _start_processing_job, app as flask_app, processing_jobs
+from vid2doc.app import _start_processing_job, create_app, processing_jobs
 
 
 def fake_process_video(settings=None, progress_callback=None, should_cancel=None):
@@ -32,7 +32,7 @@ def test_progress_throttle_and_gpu_log_absent(monkeypatch):
 
     job_id = _start_processing_job('uploads/test_small.mp4', {'extraction_method': 'frame_analysis_gpu'})
     # Poll until complete
-    with flask_app.test_client() as client:
+    with create_app().test_client() as client:
         final = None
         for _ in range(50):
             resp = client.get(f'/api/progress/{job_id}')
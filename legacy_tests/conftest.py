@@ -1,18 +1,18 @@
 import tempfile
 import os
 import shutil
-import sys
 import pytest
 
-# Ensure repository root is on sys.path so local modules import correctly during pytest
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
-
 
 @pytest.fixture(autouse=True)
-def use_temp_db(tmp_path, monkeypatch):
-    """Create a temporary sqlite DB file for tests and initialize schema."""
+def use_temp_db(request, tmp_path, monkeypatch):
+    """Create a temporary sqlite DB file for tests and initialize schema.
+
+    Skipped for tests using `db_session`, which share their module's database.
+    """
+    if 'db_session' in request.fixturenames:
+        yield
+        return
     db_file = tmp_path / "test_video_documentation.db"
     
     # Set environment variable for the test database
@@ -33,12 +33,37 @@ def use_temp_db(tmp_path, monkeypatch):
         pass
 
 
+@pytest.fixture(scope='module')
+def _module_conn(tmp_path_factory):
+    """One connection per test module holding an outer transaction that is never committed."""
+    from vid2doc.models_sqlalchemy import Base, _engine_for
+
+    db_file = tmp_path_factory.mktemp('db_session') / 'test_video_documentation.db'
+    engine = _engine_for(f'sqlite:///{db_file}')
+    Base.metadata.create_all(bind=engine)
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+    engine.dispose()
+
+
 @pytest.fixture
-def db_session():
-    """Provide a SQLAlchemy session for tests."""
-    from vid2doc.models_sqlalchemy import SessionLocal
-    session = SessionLocal()
+def db_session(_module_conn):
+    """Provide a SQLAlchemy session whose work, commits included, is rolled back after the test.
+
+    Sessions share the module's connection; each test runs inside a SAVEPOINT.
+    """
+    from sqlalchemy.orm import Session
+    savepoint = _module_conn.begin_nested()
+    try:
+        session = Session(bind=_module_conn, join_transaction_mode='create_savepoint')
+    except TypeError:
+        # SQLAlchemy 1.4 has no join_transaction_mode; its sessions never commit an outer transaction
+        session = Session(bind=_module_conn)
     try:
         yield session
     finally:
         session.close()
+        savepoint.rollback()
@@ -1,12 +1,6 @@
 import os
-import sys
-import tempfile
-import shutil
 import pytest
 
-# Ensure workspace root is on sys.path so local modules can be imported
-sys.path.insert(0, os.path.abspath(os.getcwd()))
-
 # We'll import the module under test
 import vid2doc.video_audio_extraction as vae
 
@@ -37,6 +31,9 @@ def test_wav_path_and_extraction_called(monkeypatch, tmp_path):
             return {"text": "recognized speech"}
 
     monkeypatch.setattr(vae, '_load_whisper_model', lambda m: FakeModel())
+    # Keep the wav tree inside tmp_path so pytest cleans it up
+    wav_root = tmp_path / 'wav'
+    monkeypatch.setattr(vae, 'WAV_ROOT', str(wav_root))
 
     # Call get_slide_text with a full path and a video_id to force per-video wav folder
     video_path = str(video_file)
@@ -47,8 +44,4 @@ def test_wav_path_and_extraction_called(monkeypatch, tmp_path):
 
     called_output = calls[0][4]
     # Expect the wav to be stored under wav/12345/
-    assert os.path.normpath(called_output).startswith(os.path.normpath(os.path.join('wav', '12345')))
-
-    # Cleanup created wav folder
-    if os.path.exists('wav'):
-        shutil.rmtree('wav')
\ No newline at end of file
+    assert os.path.normpath(called_output).startswith(os.path.normpath(str(wav_root / '12345')))
\ No newline at end of file
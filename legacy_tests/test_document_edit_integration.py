@@ -1,6 +1,6 @@
 import json
 import re
-from vid2doc.app import app
+from vid2doc.app import create_app
 import vid2doc.database as database
 
 
@@ -33,7 +33,7 @@ def test_document_api_and_ui_flow():
     vid, sid, tid = create_test_video()
 
     try:
-        client = app.test_client()
+        client = create_app().test_client()
 
         # 1) GET /api/videos should include our video
         rv = client.get('/api/videos')
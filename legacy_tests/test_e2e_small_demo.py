@@ -69,11 +69,12 @@ def test_e2e_process_and_pdf(tmp_path):
     generate_pdf_from_video_id(video_id, pdf_path, 'E2E Small Demo')
 
     assert os.path.exists(pdf_path), 'PDF not created'
-    assert os.path.getsize(pdf_path) > 0, 'PDF is empty'
+    pdf_size = os.stat(pdf_path).st_size
+    assert pdf_size > 0, 'PDF is empty'
 
     # Persist run metadata to test_output with a timestamped filename
     import json
-    pdf_size_kb = os.path.getsize(pdf_path) / 1024.0 if os.path.exists(pdf_path) else 0
+    pdf_size_kb = pdf_size / 1024.0
     run_meta = {
         'video': TEST_VIDEO,
         'video_id': video_id,
@@ -14,24 +14,21 @@ def has_dependencies():
     return True
 
 
-@pytest.mark.skipif(not has_dependencies(), reason="Katna or ffmpeg not available")
-def test_katna_max_keyframes_10(tmp_path):
-    from katna_processor import extract_keyframes_katna
-    inp = "videos/small_demo_video.mp4"
-    out = str(tmp_path / "out10")
-    os.makedirs(out, exist_ok=True)
-    kf = extract_keyframes_katna(inp, out, scale_percent=50, max_keyframes=10)
-    assert isinstance(kf, list)
-    assert len(kf) == 10
+# Probe once at import; every case shares the result
+_HAS_DEPS = has_dependencies()
 
 
-@pytest.mark.skipif(not has_dependencies(), reason="Katna or ffmpeg not available")
-def test_katna_max_keyframes_0_uses_default(tmp_path):
+@pytest.mark.skipif(not _HAS_DEPS, reason="Katna or ffmpeg not available")
+@pytest.mark.parametrize("max_keyframes, expected", [
+    (10, 10),
+    # Fallback default is 5 in our compatibility path
+    (0, 5),
+])
+def test_katna_max_keyframes(tmp_path, max_keyframes, expected):
     from katna_processor import extract_keyframes_katna
     inp = "videos/small_demo_video.mp4"
-    out = str(tmp_path / "out0")
+    out = str(tmp_path / f"out{max_keyframes}")
     os.makedirs(out, exist_ok=True)
-    kf = extract_keyframes_katna(inp, out, scale_percent=50, max_keyframes=0)
+    kf = extract_keyframes_katna(inp, out, scale_percent=50, max_keyframes=max_keyframes)
     assert isinstance(kf, list)
-    # Fallback default is 5 in our compatibility path
-    assert len(kf) == 5
+    assert len(kf) == expected
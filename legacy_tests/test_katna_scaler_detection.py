@@ -12,6 +12,18 @@ def fake_completed(returncode=0, stdout="", stderr=""):
     return p
 
 
+# Canned responses for a host whose GPU encode fails, checked in order against the
+# executable name and the exact arguments of each command; anything else is the CPU run
+_GPU_FAILS_RESPONSES = (
+    # a plausible width/height
+    ('ffprobe', fake_completed(returncode=0, stdout='1280\n720\n')),
+    ('-filters', fake_completed(returncode=0, stdout='scale_npp something')),
+    ('-encoders', fake_completed(returncode=0, stdout='h264_nvenc')),
+    ('h264_nvenc', fake_completed(returncode=1, stderr='gpu fail')),
+)
+_CPU_RUN_OK = fake_completed(returncode=0, stdout='ok')
+
+
 def test_ffmpeg_feature_detection_cpu_only(monkeypatch):
     # Simulate ffmpeg -filters and -encoders without GPU features
     monkeypatch.setattr(subprocess, 'run', lambda *a, **k: fake_completed(returncode=0, stdout='scale, crop, transpose'))
@@ -38,19 +50,7 @@ def test_run_ffmpeg_command_writes_log_on_error(tmp_path, monkeypatch):
 def test_benchmark_prefers_cpu_when_gpu_fails(monkeypatch, tmp_path):
     # Simulate GPU available but GPU run fails and CPU run succeeds
     def fake_run(cmd, capture_output=True, text=True, timeout=None):
-        s = ' '.join(cmd)
-        if 'ffprobe' in s:
-            # return a plausible width/height
-            return fake_completed(returncode=0, stdout='1280\n720\n')
-        if '-filters' in s:
-            return fake_completed(returncode=0, stdout='scale_npp something')
-        if '-encoders' in s:
-            return fake_completed(returncode=0, stdout='h264_nvenc')
-        if 'h264_nvenc' in s:
-            # Simulate GPU run failure
-            return fake_completed(returncode=1, stderr='gpu fail')
-        # CPU run
-        return fake_completed(returncode=0, stdout='ok')
+        return next((cp for token, cp in _GPU_FAILS_RESPONSES if token in cmd[0] or token in cmd), _CPU_RUN_OK)
 
     monkeypatch.setattr(subprocess, 'run', fake_run)
     choice = katna_processor._benchmark_scalers('clipped/sample.mp4', 50, secs=1)
@@ -9,6 +9,16 @@ def fake_completed(returncode=0, stdout="", stderr=""):
     return p
 
 
+# Canned ffprobe/ffmpeg responses for a host whose ffmpeg has the GPU scaler and encoder,
+# checked in order against the executable name and the exact arguments of each command
+_GPU_HOST_RESPONSES = (
+    ('ffprobe', fake_completed(returncode=0, stdout='640\n480\n')),
+    ('-filters', fake_completed(returncode=0, stdout='scale_npp')),
+    ('-encoders', fake_completed(returncode=0, stdout='h264_nvenc')),
+)
+_FFMPEG_FAILED = fake_completed(returncode=1, stderr='fail')
+
+
 def test_missing_ffmpeg(monkeypatch):
     # Simulate ffmpeg not found by making subprocess.run raise
     def fake_run(*a, **k):
@@ -26,15 +36,8 @@ def test_missing_ffmpeg(monkeypatch):
 def test_both_scalers_fail(monkeypatch, tmp_path):
     # Simulate ffprobe OK, GPU path available but both GPU and CPU fail
     def fake_run(cmd, capture_output=True, text=True, timeout=None):
-        s = ' '.join(cmd)
-        if 'ffprobe' in s:
-            return fake_completed(returncode=0, stdout='640\n480\n')
-        if '-filters' in s:
-            return fake_completed(returncode=0, stdout='scale_npp')
-        if '-encoders' in s:
-            return fake_completed(returncode=0, stdout='h264_nvenc')
-        # Any ffmpeg invocation fails
-        return fake_completed(returncode=1, stderr='fail')
+        # Any ffmpeg invocation other than the feature queries fails
+        return next((cp for token, cp in _GPU_HOST_RESPONSES if token in cmd[0] or token in cmd), _FFMPEG_FAILED)
 
     monkeypatch.setattr(subprocess, 'run', fake_run)
     try:
@@ -5,26 +5,29 @@ import tempfile
 import vid2doc.database as database
 
 
-def init_temp_db(tmp_path):
+def init_temp_db(tmp_path, monkeypatch):
     db_file = tmp_path / "test_video_doc.db"
     # Use a fresh database path for the database module
     database.DATABASE_PATH = str(db_file)
+    # Throwaway DB: skip journal fsyncs on every connection the helpers open
+    monkeypatch.setenv('VID2DOC_TEST_FAST', '1')
     # Reinitialize DB schema
     database.init_db()
     return database
 
 
-def test_merge_append(tmp_path):
-    db = init_temp_db(tmp_path)
+def test_merge_append(tmp_path, monkeypatch):
+    db = init_temp_db(tmp_path, monkeypatch)
 
-    # Create video and slides
-    vid = db.add_video('test.mp4', '/videos/test.mp4', duration=60.0, fps=30.0)
-    s1 = db.add_slide(vid, 10, 0.333, 'output/img_s1.jpg')
-    s2 = db.add_slide(vid, 20, 0.666, 'output/img_s2.jpg')
+    with db.bulk_context() as conn:
+        # Create video and slides
+        vid = db.add_video('test.mp4', '/videos/test.mp4', duration=60.0, fps=30.0, conn=conn)
+        s1 = db.add_slide(vid, 10, 0.333, 'output/img_s1.jpg', conn=conn)
+        s2 = db.add_slide(vid, 20, 0.666, 'output/img_s2.jpg', conn=conn)
 
-    # Set final text for both slides
-    db.set_final_text_for_slide(s1, 'SOURCE TEXT')
-    db.set_final_text_for_slide(s2, 'TARGET TEXT')
+        # Set final text for both slides
+        db.set_final_text_for_slide(s1, 'SOURCE TEXT', conn=conn)
+        db.set_final_text_for_slide(s2, 'TARGET TEXT', conn=conn)
 
     # Merge s1 into s2 (append)
     res = db.merge_from_slide_into_target(s1, s2, append=True)
@@ -43,15 +46,16 @@ def test_merge_append(tmp_path):
     assert db.get_text_extract_by_slide(s1) is None
 
 
-def test_merge_prepend(tmp_path):
-    db = init_temp_db(tmp_path)
+def test_merge_prepend(tmp_path, monkeypatch):
+    db = init_temp_db(tmp_path, monkeypatch)
 
-    vid = db.add_video('test2.mp4', '/videos/test2.mp4', duration=30.0, fps=24.0)
-    s1 = db.add_slide(vid, 1, 0.1, 'output/img_a.jpg')
-    s2 = db.add_slide(vid, 2, 0.2, 'output/img_b.jpg')
+    with db.bulk_context() as conn:
+        vid = db.add_video('test2.mp4', '/videos/test2.mp4', duration=30.0, fps=24.0, conn=conn)
+        s1 = db.add_slide(vid, 1, 0.1, 'output/img_a.jpg', conn=conn)
+        s2 = db.add_slide(vid, 2, 0.2, 'output/img_b.jpg', conn=conn)
 
-    db.set_final_text_for_slide(s1, 'FIRST')
-    db.set_final_text_for_slide(s2, 'SECOND')
+        db.set_final_text_for_slide(s1, 'FIRST', conn=conn)
+        db.set_final_text_for_slide(s2, 'SECOND', conn=conn)
 
     res = db.merge_from_slide_into_target(s1, s2, append=False)
     assert res is not None
@@ -4,17 +4,19 @@ import shutil
 from vid2doc.models_sqlalchemy import Video, Slide, TextExtract, SessionLocal
 import datetime
 
+from sqlalchemy import delete
+
 
 def test_add_save_delete_cycle(db_session):
-    # Create a temporary video row to associate slides with
+    # Build the rows in one transaction; flush() assigns ids without committing
     video = Video(filename='test_video.mp4', original_path='uploads/test', upload_date=datetime.datetime.utcnow())
     db_session.add(video)
-    db_session.commit()
+    db_session.flush()
 
     # Add a minimal slide
     slide = Slide(video_id=video.id, frame_number=1, timestamp=0.0, image_path='output/slide_1.jpg')
     db_session.add(slide)
-    db_session.commit()
+    db_session.flush()
 
     # Verify slide was added
     assert slide.id is not None
@@ -30,15 +32,14 @@ def test_add_save_delete_cycle(db_session):
     assert len(slide.text_extracts) == 1
     assert slide.text_extracts[0].final_text == 'final_text_test'
 
-    # Delete the slide (this should cascade delete text extracts if configured, but for now manual)
-    db_session.delete(text_extract)
-    db_session.delete(slide)
+    # Delete the text extract, slide and video with Core statements in a single commit
+    slide_id, video_id = slide.id, video.id
+    db_session.execute(delete(TextExtract).where(TextExtract.slide_id == slide_id))
+    db_session.execute(delete(Slide).where(Slide.id == slide_id))
+    db_session.execute(delete(Video).where(Video.id == video_id))
     db_session.commit()
+    db_session.expunge_all()
 
     # Ensure slide no longer exists
-    deleted_slide = db_session.query(Slide).filter_by(id=slide.id).first()
+    deleted_slide = db_session.query(Slide).filter_by(id=slide_id).first()
     assert deleted_slide is None
-
-    # Cleanup: remove the video row we created
-    db_session.delete(video)
-    db_session.commit()
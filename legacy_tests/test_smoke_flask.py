@@ -16,10 +16,12 @@ def main():
     print("FLASK APP SMOKE TEST")
     print("="*70)
 
-    # Test 1: Import Flask app
+    # Test 1: Import and create Flask app
     print("\n1. Testing Flask app import...")
     try:
-        from vid2doc.app import app
+        from vid2doc.app import create_app
+        # Importing only defines the app; create_app() initialises the database and folders
+        app = create_app()
         print("✓ Flask app imported successfully")
     except Exception as e:
         print(f"✗ Failed to import Flask app: {e}")
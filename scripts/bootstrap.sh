@@ -30,6 +30,10 @@ echo "Upgrading pip and installing full Python requirements (this may take a whi
 "$VENV_PY" -m pip install --upgrade pip setuptools wheel >/dev/null
 "$VENV_PY" -m pip install -r requirements.txt
 
+# Byte-compile the package up front so the first server start doesn't pay for it
+echo "Byte-compiling vid2doc..."
+"$VENV_PY" -m compileall -q vid2doc
+
 # Check system tools
 MISSING_SYSTEM=0
 if command -v ffprobe >/dev/null 2>&1; then
@@ -1,10 +1,12 @@
 """Simple runtime check that the Flask app reports health via /api/health.
 
 Usage:
-  .venv/bin/python scripts/check_api_health.py
+  .venv/bin/python scripts/check_api_health.py [--timeout SECONDS]
 """
+import argparse
 import sys
 import os
+import threading
 
 # Ensure repository root is on sys.path so 'vid2doc' can be imported when this
 # script is executed directly.
@@ -12,19 +14,51 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from vid2doc.app import app
 
-with app.test_client() as client:
-    resp = client.get('/api/health')
+def _get_health(app, result):
+    try:
+        with app.test_client() as client:
+            result['response'] = client.get('/api/health')
+    except Exception as exc:
+        result['error'] = exc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the /api/health endpoint of the vid2doc Flask app.')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='seconds to wait for the health response before failing (default: 10)')
+    args = parser.parse_args(argv)
+
+    # Import lazily so argument errors and --help don't pay the app start-up cost
+    from vid2doc import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+
+    result = {}
+    worker = threading.Thread(target=_get_health, args=(app, result), daemon=True)
+    worker.start()
+    worker.join(args.timeout)
+    if 'error' in result:
+        print(f"ERROR: /api/health request failed: {result['error']}")
+        return 2
+    if 'response' not in result:
+        print(f"ERROR: /api/health did not respond within {args.timeout}s")
+        return 4
+
+    resp = result['response']
     if resp.status_code != 200:
         print(f"ERROR: /api/health returned status {resp.status_code}")
-        sys.exit(2)
+        return 2
     data = resp.get_json() or {}
     print("/api/health ->", data)
     # Basic validation
     if not data.get('ffprobe') and not data.get('packages', {}).get('sqlalchemy'):
         print("ERROR: critical dependencies missing according to /api/health")
-        sys.exit(3)
+        return 3
+
+    print("Health endpoint OK")
+    return 0
+
 
-print("Health endpoint OK")
-sys.exit(0)
+if __name__ == '__main__':
+    sys.exit(main())
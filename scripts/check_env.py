@@ -7,7 +7,7 @@ Usage:
 """
 import sys
 import shutil
-import importlib
+import importlib.util
 
 REQUIRED_IMPORTS = {
     "flask": "Flask (web framework)",
@@ -24,22 +24,29 @@ OPTIONAL_IMPORTS = {
 
 MISSING = []
 
+
+def _is_installed(mod):
+    """Return True if `mod` is importable, without executing its top-level code."""
+    try:
+        return importlib.util.find_spec(mod) is not None
+    except (ImportError, ValueError):
+        return False
+
+
 print("Checking Python imports...")
 for mod, desc in REQUIRED_IMPORTS.items():
-    try:
-        importlib.import_module(mod)
-        print(f"✓ {desc} (imported {mod})")
-    except Exception:
-        print(f"✗ Missing: {desc} (cannot import {mod})")
+    if _is_installed(mod):
+        print(f"✓ {desc} (found {mod})")
+    else:
+        print(f"✗ Missing: {desc} (cannot find {mod})")
         MISSING.append((mod, desc))
 
 print("\nChecking optional/imported packages...")
 for mod, desc in OPTIONAL_IMPORTS.items():
-    try:
-        importlib.import_module(mod)
-        print(f"✓ {desc} (imported {mod})")
-    except Exception:
-        print(f"⚠ Optional missing: {desc} (cannot import {mod})")
+    if _is_installed(mod):
+        print(f"✓ {desc} (found {mod})")
+    else:
+        print(f"⚠ Optional missing: {desc} (cannot find {mod})")
 
 print("\nChecking system tools...")
 for tool in ("ffprobe", "ffmpeg", "git"):
@@ -1,3 +1,8 @@
+import pytest
+
+pytestmark = pytest.mark.db
+
+
 def test_purge_modal_present():
     from vid2doc.app import app
     client = app.test_client()
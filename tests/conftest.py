@@ -1,31 +1,93 @@
 import tempfile
 import os
 import shutil
+import sqlite3
 import sys
 import pytest
 
-# Ensure repository root is on sys.path so local modules import correctly during pytest
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def _schema_template():
+    """Build the SQLAlchemy schema once in an in-memory SQLite database.
+
+    Each test clones it into its own file with the sqlite3 backup API, which is
+    a page copy rather than a full CREATE TABLE pass.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from vid2doc.models_sqlalchemy import Base
+
+    template = sqlite3.connect(':memory:', check_same_thread=False)
+    engine = create_engine('sqlite://', creator=lambda: template, poolclass=StaticPool, future=True)
+    Base.metadata.create_all(bind=engine)
+    yield template
+    engine.dispose()
+    template.close()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Request `use_temp_db` for tests marked `db` (DB test modules set
+    `pytestmark = pytest.mark.db`), and pin tests marked `serial` to one xdist
+    worker (effective with `-n auto --dist loadgroup`)."""
+    for item in items:
+        if item.get_closest_marker('serial'):
+            item.add_marker(pytest.mark.xdist_group('serial'))
+        if 'use_temp_db' in item.fixturenames or 'mem_db' in item.fixturenames:
+            continue
+        if item.get_closest_marker('db'):
+            item.fixturenames.insert(0, 'use_temp_db')
+
+
+class _SilentWhisperModel:
+    def transcribe(self, wav_path):
+        return {"text": ""}
 
 
 @pytest.fixture(autouse=True)
-def use_temp_db(tmp_path, monkeypatch):
-    """Create a temporary sqlite DB file for tests and initialize schema."""
+def _stub_whisper(request, monkeypatch):
+    """Never load a real Whisper model unless the test is marked `needs_whisper`.
+
+    Only patches when video_audio_extraction is already imported (test modules
+    import it at collection), so tests that don't use it don't pay for the
+    whisper/torch import. Tests can still monkeypatch their own loader on top.
+    """
+    vae = sys.modules.get('vid2doc.video_audio_extraction')
+    if vae is None or request.node.get_closest_marker('needs_whisper'):
+        return
+    monkeypatch.setattr(vae, '_load_whisper_model', lambda model_size: _SilentWhisperModel())
+
+
+@pytest.fixture
+def use_temp_db(tmp_path, monkeypatch, _schema_template):
+    """Create a temporary sqlite DB file for tests, cloned from the schema template.
+
+    Both the SQLAlchemy engine and the sqlite3 helpers in vid2doc.database point
+    at it. tmp_path is unique per test (and per xdist worker), so parallel runs
+    never share a database file.
+    """
     db_file = tmp_path / "test_video_documentation.db"
     
     # Set environment variable for the test database
     monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_file}')
-    
-    # Import and reinitialize the engine with the test database
-    from vid2doc.models_sqlalchemy import reinit_engine, init_models
+
+    # Copy the pre-built schema into the test database file
+    dest = sqlite3.connect(str(db_file))
+    try:
+        _schema_template.backup(dest)
+    finally:
+        dest.close()
+
+    # Point the sqlite3 helpers at the same file; init_db only adds what the ORM schema lacks
+    import vid2doc.database as database
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(db_file))
+    database.init_db()
+
+    # Bind the engine to the already-initialized test database
+    from vid2doc.models_sqlalchemy import reinit_engine
     reinit_engine(f'sqlite:///{db_file}')
-    
-    # Initialize schema
-    init_models()
     yield
     # cleanup if needed
+    database.close_idle_connections(str(db_file))
     try:
         if db_file.exists():
             db_file.unlink()
@@ -34,14 +96,66 @@ def use_temp_db(tmp_path, monkeypatch):
 
 
 @pytest.fixture
-def db_session():
-    """Provide a SQLAlchemy session for tests."""
-    from vid2doc.models_sqlalchemy import SessionLocal
-    session = SessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+def mem_db(monkeypatch):
+    """Point vid2doc.database at a private shared-cache in-memory database.
+
+    For tests of the sqlite3 helpers that don't need the SQLAlchemy engine or a
+    file on disk: commits never touch the filesystem. The database lives while
+    any (pooled) connection to it is open and is dropped at teardown. Shared
+    cache uses table locks without a busy timeout, so avoid it for tests that
+    write from background threads.
+    """
+    import uuid
+    import vid2doc.database as database
+    path = f'file:vid2doc_{uuid.uuid4().hex}?mode=memory&cache=shared'
+    monkeypatch.setattr(database, 'DATABASE_PATH', path)
+    database.init_db()
+    yield path
+    database.close_idle_connections(path)
+
+
+DEMO_VIDEO_PATH = 'videos/small_demo_video.mp4'
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """One Flask test client shared by the whole session.
+
+    create_app() runs init_db() once; point it at a throwaway file so the
+    session never touches ./video_documentation.db. Tests that use the client
+    get their own database from `use_temp_db`.
+    """
+    import vid2doc.database as database
+    from vid2doc.app import create_app
+    db_file = tmp_path_factory.mktemp('app_db') / 'test_video_documentation.db'
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(database, 'DATABASE_PATH', str(db_file))
+        app = create_app()
+    database.close_idle_connections(str(db_file))
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def demo_video_path():
+    """Path of the demo video, checked for existence once per session."""
+    assert os.path.exists(DEMO_VIDEO_PATH), 'Test video missing'
+    return DEMO_VIDEO_PATH
+
+
+@pytest.fixture
+def wait_for_job():
+    """Return `wait(client, job_id, timeout=5)`, which blocks until the job's worker
+    finishes and then fetches its final state with a single /api/progress request."""
+    from vid2doc.app import job_done_events
+
+    def wait(client, job_id, timeout=5):
+        done = job_done_events.get(job_id)
+        assert done is not None and done.wait(timeout), 'Job did not finish in time'
+        r = client.get(f'/api/progress/{job_id}')
+        assert r.status_code == 200
+        return r.get_json()['job']
+    return wait
 
 
 @pytest.fixture
@@ -1,19 +1,40 @@
 import os
+import shutil
 import tempfile
 import subprocess
 import pytest
 
 
-@pytest.fixture
-def synthetic_video_path(tmp_path):
-    """Create a small synthetic MP4 video and return its path.
+@pytest.fixture(scope="session")
+def _synthetic_video_template(tmp_path_factory):
+    """Encode a small synthetic MP4 once per session and return its path.
 
-    Attempts to use OpenCV to write a short MP4. If OpenCV isn't available, tries to use ffmpeg if present on PATH.
+    Uses ffmpeg's lavfi test source when ffmpeg is on PATH, since it encodes
+    natively without a Python frame loop. Falls back to OpenCV otherwise.
     If neither is available, skips the tests that require a video.
     """
-    out = tmp_path / "synthetic.mp4"
+    out = tmp_path_factory.mktemp("synthetic_video") / "synthetic.mp4"
+
+    # Try ffmpeg first
+    if shutil.which("ffmpeg"):
+        cmd = [
+            "ffmpeg", "-y",
+            "-f", "lavfi",
+            "-i", "testsrc=duration=2:size=320x240:rate=10",
+            "-c:v", "libx264",
+            "-preset", "ultrafast",
+            "-tune", "fastdecode",
+            "-pix_fmt", "yuv420p",
+            str(out)
+        ]
+        try:
+            p = subprocess.run(cmd, capture_output=True, timeout=10)
+            if p.returncode == 0 and out.stat().st_size > 0:
+                return str(out)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            pass
 
-    # Try OpenCV approach
+    # Fallback to OpenCV
     try:
         import cv2
         import numpy as np
@@ -31,19 +52,18 @@ def synthetic_video_path(tmp_path):
         writer.release()
         return str(out)
     except Exception:
-        # Fallback to ffmpeg if available
-        if subprocess.run(["ffmpeg", "-version"], capture_output=True).returncode == 0:
-            # Use ffmpeg to generate a test pattern
-            cmd = [
-                "ffmpeg", "-y",
-                "-f", "lavfi",
-                "-i", "testsrc=duration=2:size=320x240:rate=10",
-                "-c:v", "libx264",
-                "-pix_fmt", "yuv420p",
-                str(out)
-            ]
-            p = subprocess.run(cmd, capture_output=True)
-            if p.returncode == 0 and out.exists():
-                return str(out)
+        pass
 
     pytest.skip("No suitable tool (opencv or ffmpeg) available to generate synthetic video")
+
+
+@pytest.fixture
+def synthetic_video_path(tmp_path, _synthetic_video_template):
+    """Return a per-test copy of the session's synthetic MP4.
+
+    Copying keeps tests free to modify or delete their video without paying for
+    another encode.
+    """
+    out = tmp_path / "synthetic.mp4"
+    shutil.copyfile(_synthetic_video_template, out)
+    return str(out)
@@ -1,19 +1,16 @@
-import io
 import os
-import time
 import pytest
 
 from vid2doc.app import app
 
+pytestmark = pytest.mark.db
 
-def test_upload_and_process():
-    client = app.test_client()
-    path = 'videos/small_demo_video.mp4'
-    assert os.path.exists(path), 'Test video missing'
 
-    with open(path, 'rb') as f:
-        data = {'video': (io.BytesIO(f.read()), os.path.basename(path))}
-        resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+@pytest.mark.serial
+def test_upload_and_process(wait_for_job, client, demo_video_path):
+    # The test client streams the open file into the multipart body and closes it afterwards
+    data = {'video': (open(demo_video_path, 'rb'), os.path.basename(demo_video_path))}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
     assert resp.status_code == 200
     payload = resp.get_json()
     assert payload['success'] is True
@@ -26,17 +23,8 @@ def test_upload_and_process():
     assert body['success'] is True
     job_id = body['job_id']
 
-    # Poll until completion
-    deadline = time.time() + 5
-    final = None
-    while time.time() < deadline:
-        r = client.get(f'/api/progress/{job_id}')
-        assert r.status_code == 200
-        j = r.get_json()['job']
-        if j['status'] in ('completed', 'error', 'cancelled'):
-            final = j
-            break
-        time.sleep(0.1)
+    # Wait for the worker to finish
+    final = wait_for_job(client, job_id)
 
     assert final is not None, 'Job did not finish in time'
     assert final['status'] == 'completed'
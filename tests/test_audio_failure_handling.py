@@ -1,40 +1,52 @@
-import os
-import sqlite3
-import time
+import pytest
 
-from vid2doc.video_audio_extraction import get_slide_text, _load_whisper_model
+from vid2doc.video_audio_extraction import get_slide_text
 import vid2doc.video_audio_extraction as vae
 import vid2doc.database as database
 
+pytestmark = pytest.mark.db
 
-def test_transcription_failure_records_audio_failure(tmp_path, monkeypatch):
-    # Use a temporary DB for the test
-    db_path = str(tmp_path / 'test_audio_fail.db')
-    database.DATABASE_PATH = db_path
-    if os.path.exists(db_path):
-        os.remove(db_path)
-    database.init_db()
 
-    # Make a tiny test video path (existing sample in repo)
-    video_path = 'videos/small_demo_video.mp4'
-    assert os.path.exists(video_path)
+class BadModel:
+    def transcribe(self, path):
+        raise RuntimeError('Simulated transcription failure')
 
-    # Monkeypatch the whisper loader to return an object whose transcribe raises
-    class BadModel:
-        def transcribe(self, path):
-            raise RuntimeError('Simulated transcription failure')
 
-    monkeypatch.setattr(vae, '_load_whisper_model', lambda model_size: BadModel())
+class EmptyModel:
+    def transcribe(self, path):
+        return {"text": ""}
 
-    # Call get_slide_text; it should return empty string and record an audio_failure
-    text = get_slide_text(video_path, 0, 30, fps=30, model_size='tiny', audio_retry_attempts=1, video_id=999)
+
+def _bad_model_loader(model_size):
+    return BadModel()
+
+
+def _missing_whisper_loader(model_size):
+    raise ImportError('whisper missing for test')
+
+
+def _empty_model_loader(model_size):
+    return EmptyModel()
+
+
+@pytest.mark.parametrize('loader, expected_stderr', [
+    pytest.param(_bad_model_loader, 'Simulated transcription failure', id='transcription-fails'),
+    pytest.param(_missing_whisper_loader, 'whisper missing for test', id='whisper-missing'),
+    # An empty transcription is not an error and must not be recorded
+    pytest.param(_empty_model_loader, None, id='empty-transcription'),
+])
+def test_get_slide_text_failure_recording(monkeypatch, demo_video_path, loader, expected_stderr):
+    # use_temp_db points the database module at a fresh per-test file
+    monkeypatch.setattr(vae, '_load_whisper_model', loader)
+
+    # get_slide_text should return an empty string rather than raise
+    text = get_slide_text(demo_video_path, 0, 30, fps=30, model_size='tiny', audio_retry_attempts=1, video_id=999)
     assert text == ''
 
     failures = database.get_audio_failures(video_id=999)
-    assert len(failures) >= 1
-    found = False
-    for f in failures:
-        # The new structured fields should include tool='whisper' and stderr containing the error
-        if (f['tool'] == 'whisper') and ('Simulated transcription failure' in (f['stderr'] or '')):
-            found = True
-    assert found, 'Expected transcription failure to be recorded in audio_failures with tool=whisper and stderr'
\ No newline at end of file
+    if expected_stderr is None:
+        assert len(failures) == 0
+        return
+    # The structured fields should include tool='whisper' and stderr containing the error
+    assert any(f['tool'] == 'whisper' and expected_stderr in (f['stderr'] or '') for f in failures), \
+        'Expected transcription failure to be recorded in audio_failures with tool=whisper and stderr'
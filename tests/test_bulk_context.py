@@ -0,0 +1,35 @@
+import pytest
+
+import vid2doc.database as database
+
+
+def test_helpers_without_conn_join_the_bulk_transaction(mem_db):
+    with database.bulk_context() as conn:
+        video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0, conn=conn)
+        slide_id = database.add_slide(video_id, 0, 0.0, 'a.jpg', conn=conn)
+        # No conn= here: these must reuse the bulk connection, not open a second one
+        database.add_text_extract(slide_id, 'original')
+        section_id = database.create_section(video_id, 'Intro', 0)
+        database.assign_slide_to_section(slide_id, section_id)
+        with database.bulk_context() as inner:
+            assert inner is conn
+
+    assert database.get_text_extract_by_slide(slide_id)['original_text'] == 'original'
+    assert database.get_slide_by_id(slide_id)['section_id'] == section_id
+
+
+def test_bulk_context_rolls_back_helper_writes(mem_db):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    slide_id = database.add_slide(video_id, 0, 0.0, 'a.jpg')
+
+    with pytest.raises(RuntimeError):
+        with database.bulk_context():
+            database.add_text_extract(slide_id, 'discarded')
+            database.mark_video_processed(video_id)
+            raise RuntimeError('boom')
+
+    assert database.get_text_extract_by_slide(slide_id) is None
+    assert not database.get_video_by_id(video_id)['processed']
+    # The thread is no longer in a bulk transaction afterwards
+    database.add_text_extract(slide_id, 'kept')
+    assert database.get_text_extract_by_slide(slide_id)['original_text'] == 'kept'
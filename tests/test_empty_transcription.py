@@ -1,16 +1,14 @@
-import io
 import os
-import time
+
+import pytest
 
 from vid2doc.app import app
 import vid2doc.video_audio_extraction as vae
 
+pytestmark = pytest.mark.db
 
-def test_empty_transcription_is_logged(monkeypatch):
-    client = app.test_client()
-    path = 'videos/small_demo_video.mp4'
-    assert os.path.exists(path)
 
+def test_empty_transcription_is_logged(monkeypatch, wait_for_job, client, demo_video_path):
     # Monkeypatch the whisper loader to return an object whose transcribe returns empty text
     class EmptyModel:
         def transcribe(self, path):
@@ -18,9 +16,9 @@ def test_empty_transcription_is_logged(monkeypatch):
 
     monkeypatch.setattr(vae, '_load_whisper_model', lambda model_size: EmptyModel())
 
-    with open(path, 'rb') as f:
-        data = {'video': (io.BytesIO(f.read()), os.path.basename(path))}
-        resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+    # The test client streams the open file into the multipart body and closes it afterwards
+    data = {'video': (open(demo_video_path, 'rb'), os.path.basename(demo_video_path))}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
     assert resp.status_code == 200
     file_id = resp.get_json()['file_id']
 
@@ -29,16 +27,8 @@ def test_empty_transcription_is_logged(monkeypatch):
     assert resp2.status_code == 200
     job_id = resp2.get_json()['job_id']
 
-    # Poll until done
-    deadline = time.time() + 5
-    final = None
-    while time.time() < deadline:
-        r = client.get(f'/api/progress/{job_id}')
-        j = r.get_json()['job']
-        if j['status'] in ('completed', 'error', 'cancelled'):
-            final = j
-            break
-        time.sleep(0.05)
+    # Wait for the worker to finish
+    final = wait_for_job(client, job_id)
 
     assert final and final['status'] == 'completed'
     # Ensure empty samples were recorded and that no audio_failure was created
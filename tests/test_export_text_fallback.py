@@ -0,0 +1,16 @@
+import vid2doc.database as database
+
+
+def test_export_rows_fall_back_to_first_non_empty_text(mem_db):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    final = database.add_slide(video_id, 0, 0.0, 'a.jpg')
+    suggested = database.add_slide(video_id, 30, 1.0, 'b.jpg')
+    original = database.add_slide(video_id, 60, 2.0, 'c.jpg')
+    empty = database.add_slide(video_id, 90, 3.0, 'd.jpg')
+    database.update_text_extract(database.add_text_extract(final, 'orig', 'sugg'), 'final')
+    database.update_text_extract(database.add_text_extract(suggested, 'orig', 'sugg'), '')
+    database.add_text_extract(original, 'orig', '')
+    database.add_text_extract(empty, '', None)
+
+    rows = {row['id']: row['text_content'] for row in database.get_all_slides_for_export()}
+    assert rows == {final: 'final', suggested: 'sugg', original: 'orig', empty: ''}
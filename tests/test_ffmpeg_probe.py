@@ -0,0 +1,45 @@
+import subprocess
+
+import vid2doc.ffmpeg_probe as ffmpeg_probe
+
+
+def test_capabilities_probed_once(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, capture_output=True, text=True, timeout=None):
+        calls.append(cmd[-1])
+        out = {
+            '-version': 'ffmpeg version 6.1 Copyright (c)\nbuilt with gcc',
+            '-filters': ' ... scale_npp  V->V  NVIDIA Performance Primitives scaler',
+            '-encoders': ' V....D libx264  H.264',
+        }[cmd[-1]]
+        return subprocess.CompletedProcess(args=cmd, returncode=0, stdout=out, stderr='')
+
+    monkeypatch.setattr(ffmpeg_probe.shutil, 'which', lambda name: '/usr/bin/ffmpeg')
+    monkeypatch.setattr(ffmpeg_probe.subprocess, 'run', fake_run)
+    ffmpeg_probe.cache_clear()
+    try:
+        caps = ffmpeg_probe.get_capabilities()
+        assert caps['version'] == 'ffmpeg version 6.1 Copyright (c)'
+        assert ffmpeg_probe.get_capabilities() is caps
+        # The listings are only fetched once something asks for them
+        assert calls == ['-version']
+        assert ffmpeg_probe.has_scale_npp() is True
+        assert ffmpeg_probe.has_nvenc() is False
+        assert ffmpeg_probe.has_nvenc() is False
+        assert calls == ['-version', '-filters', '-encoders']
+    finally:
+        ffmpeg_probe.cache_clear()
+
+
+def test_capabilities_without_ffmpeg(monkeypatch):
+    monkeypatch.setattr(ffmpeg_probe.shutil, 'which', lambda name: None)
+    ffmpeg_probe.cache_clear()
+    try:
+        caps = ffmpeg_probe.get_capabilities()
+        assert caps['path'] is None
+        assert caps['version'] is None
+        assert ffmpeg_probe.get_encoders() == ''
+        assert not ffmpeg_probe.has_nvenc()
+    finally:
+        ffmpeg_probe.cache_clear()
@@ -1,23 +1,21 @@
-import io
 import os
-import time
+
+import pytest
 
 from vid2doc.app import app
 
+pytestmark = pytest.mark.db
 
-def test_job_logs_endpoint_includes_job_logs_and_host(tmp_path):
-    client = app.test_client()
-    path = 'videos/small_demo_video.mp4'
-    assert os.path.exists(path)
 
+def test_job_logs_endpoint_includes_job_logs_and_host(tmp_path, wait_for_job, client, demo_video_path):
     # Create a small host log file and configure app to use it
     host_log = tmp_path / 'app.log'
     host_log.write_text('\n'.join([f'line {i}' for i in range(1, 21)]))
     app.config['LOG_FILE'] = str(host_log)
 
-    with open(path, 'rb') as f:
-        data = {'video': (io.BytesIO(f.read()), os.path.basename(path))}
-        resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+    # The test client streams the open file into the multipart body and closes it afterwards
+    data = {'video': (open(demo_video_path, 'rb'), os.path.basename(demo_video_path))}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
     assert resp.status_code == 200
     file_id = resp.get_json()['file_id']
 
@@ -26,15 +24,7 @@ def test_job_logs_endpoint_includes_job_logs_and_host(tmp_path):
     job_id = resp2.get_json()['job_id']
 
     # Wait to complete
-    deadline = time.time() + 5
-    final = None
-    while time.time() < deadline:
-        r = client.get(f'/api/progress/{job_id}')
-        j = r.get_json()['job']
-        if j['status'] in ('completed', 'error', 'cancelled'):
-            final = j
-            break
-        time.sleep(0.05)
+    final = wait_for_job(client, job_id)
 
     assert final and final['status'] == 'completed'
 
@@ -0,0 +1,85 @@
+import json
+import time
+
+import pytest
+
+from vid2doc.app import _start_processing_job, job_done_events
+
+pytestmark = pytest.mark.db
+
+
+class ChattyProcessor:
+    def __init__(self, path, out):
+        pass
+
+    def process_video(self, settings, progress_callback, should_cancel):
+        progress_callback({'type': 'started', 'total_frames': 10, 'fps': 10})
+        progress_callback({'type': 'status', 'message': 'halfway\nthere', 'frames': 5, 'total_frames': 10})
+        progress_callback({'type': 'complete', 'video_id': 1})
+
+
+def test_job_stream_pushes_logs_and_ends_on_completion(monkeypatch, client):
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', ChattyProcessor)
+    job_id = _start_processing_job('uploads/test_small.mp4', {})
+
+    resp = client.get(f'/api/job/{job_id}/stream')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/event-stream'
+    body = resp.get_data(as_text=True)
+    assert job_done_events[job_id].is_set()
+
+    assert 'data: Processing started\n\n' in body
+    assert 'data: halfway\ndata: there\n\n' in body
+    assert 'data: Processing completed\n\n' in body
+    assert body.rstrip().endswith('event: end\ndata: completed')
+
+    progress = [json.loads(chunk.split('data: ', 1)[1]) for chunk in body.split('\n\n') if chunk.startswith('event: progress')]
+    assert progress[-1] == {'status': 'completed', 'percent_complete': 100.0}
+
+
+class SilentProcessor:
+    def __init__(self, path, out):
+        pass
+
+    def process_video(self, settings, progress_callback, should_cancel):
+        # Returns without ever reporting completion
+        progress_callback({'type': 'started', 'total_frames': 10, 'fps': 10})
+
+
+def test_job_stream_ends_when_worker_finishes_without_final_status(monkeypatch, client):
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', SilentProcessor)
+    job_id = _start_processing_job('uploads/test_small.mp4', {})
+
+    body = client.get(f'/api/job/{job_id}/stream').get_data(as_text=True)
+
+    assert job_done_events[job_id].is_set()
+    assert body.rstrip().endswith('event: end\ndata: running')
+
+
+def test_job_stream_unknown_job_returns_404(client):
+    resp = client.get('/api/job/does-not-exist/stream')
+    assert resp.status_code == 404
+
+
+class StalledProcessor:
+    def __init__(self, path, out):
+        pass
+
+    def process_video(self, settings, progress_callback, should_cancel):
+        progress_callback({'type': 'started', 'total_frames': 10, 'fps': 10})
+        while not should_cancel():
+            time.sleep(0.01)
+
+
+def test_job_stream_closes_after_its_max_lifetime(monkeypatch, client):
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', StalledProcessor)
+    monkeypatch.setattr('vid2doc.app.JOB_STREAM_MAX_LIFETIME', 0.2)
+    job_id = _start_processing_job('uploads/test_small.mp4', {})
+    try:
+        body = client.get(f'/api/job/{job_id}/stream').get_data(as_text=True)
+        assert 'data: Processing started\n\n' in body
+        assert 'event: end' not in body
+        assert not job_done_events[job_id].is_set()
+    finally:
+        client.post(f'/api/job/{job_id}/cancel')
+        assert job_done_events[job_id].wait(5)
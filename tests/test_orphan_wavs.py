@@ -0,0 +1,20 @@
+import os
+
+from vid2doc.app import _referenced_wavs
+
+
+def test_referenced_wavs_matches_basename_substrings():
+    paths = [os.path.join('wav', name) for name in ('a.wav', 'b.wav', 'clip 1.wav', 'LOUD.WAV', 'unused.wav')]
+    texts = [
+        'audio at wav/7/xa.wav and b.wav.bak',
+        'segment "clip 1.wav"',
+        'LOUD.WAV',
+        None,
+    ]
+    # 'a.wav' is a substring of 'xa.wav', which keeps the old `name in text` semantics
+    assert _referenced_wavs(paths, texts) == {
+        os.path.join('wav', 'a.wav'),
+        os.path.join('wav', 'b.wav'),
+        os.path.join('wav', 'clip 1.wav'),
+        os.path.join('wav', 'LOUD.WAV'),
+    }
@@ -0,0 +1,70 @@
+import pytest
+
+pypdf = pytest.importorskip('pypdf')
+pytest.importorskip('reportlab')
+
+import vid2doc.database as database
+import vid2doc.pdf_generator_improved as pdf_generator
+
+pytestmark = pytest.mark.db
+
+
+def _page_texts(path):
+    return [page.extract_text() for page in pypdf.PdfReader(str(path)).pages]
+
+
+def _add_slide(video_id, frame, text):
+    slide_id = database.add_slide(video_id, frame, frame / 30.0, f'missing_{frame}.jpg')
+    database.add_text_extract(slide_id, text)
+    return slide_id
+
+
+def test_slide_text_is_not_parsed_as_markup(tmp_path):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    _add_slide(video_id, 0, 'R&D <script> a < b')
+
+    out = tmp_path / 'out.pdf'
+    pdf_generator.generate_pdf_from_video_id(video_id, str(out), 'Title', 'Summary & <notes>')
+
+    text = ''.join(_page_texts(out))
+    assert 'R&D <script> a < b' in text
+    assert 'Summary & <notes>' in text
+
+
+def test_slides_follow_order_index_and_long_text_continues(tmp_path):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    first = _add_slide(video_id, 0, 'frame zero')
+    second = _add_slide(video_id, 30, 'frame thirty ' + 'word ' * 1500 + 'THE-END')
+    # Manually moved ahead of the earlier frame
+    database.set_slide_order(second, -1)
+
+    out = tmp_path / 'out.pdf'
+    pdf_generator.generate_pdf_from_video_id(video_id, str(out))
+
+    text = ''.join(_page_texts(out)[2:])
+    assert text.index('frame thirty') < text.index('THE-END') < text.index('frame zero')
+    assert first
+
+
+def test_parallel_sections_match_serial_output(tmp_path, monkeypatch):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    for index in range(4):
+        # Section 1 flows on from section 0; the others start new pages
+        section_id = database.create_section(video_id, f'Section {index}', index, create_new_page=index != 1)
+        for n in range(1):
+            slide_id = _add_slide(video_id, index * 100 + n, f'section {index} slide {n}')
+            database.assign_slide_to_section(slide_id, section_id)
+
+    serial = tmp_path / 'serial.pdf'
+    monkeypatch.setattr(pdf_generator, 'PARALLEL_SECTION_THRESHOLD', 1000)
+    pdf_generator.generate_pdf_from_video_id(video_id, str(serial))
+    parallel = tmp_path / 'parallel.pdf'
+    monkeypatch.setattr(pdf_generator, 'PARALLEL_SECTION_THRESHOLD', 3)
+    pdf_generator.generate_pdf_from_video_id(video_id, str(parallel))
+
+    serial_pages = _page_texts(serial)
+    assert _page_texts(parallel) == serial_pages
+    # Title, summary, then sections 0+1 together and 2 and 3 on their own pages
+    assert len(serial_pages) == 5
+    assert 'Section 0' in serial_pages[2] and 'Section 1' in serial_pages[2]
+    assert 'Section 3' in serial_pages[4]
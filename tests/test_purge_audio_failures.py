@@ -1,26 +1,21 @@
-import os
 import time
 from datetime import datetime, timedelta
 
 import vid2doc.database as database
 
 
-def test_purge_audio_failures_older_than(tmp_path):
-    # Use a fresh DB
-    db_file = str(tmp_path / 'test_purge.db')
-    database.DATABASE_PATH = db_file
-    if os.path.exists(db_file):
-        os.remove(db_file)
-    database.init_db()
-
-    conn = database.get_db_connection()
-    cur = conn.cursor()
-    # Insert one old failure and one recent failure
+def test_purge_audio_failures_older_than(mem_db):
+    # Insert one old failure and one recent failure in a single transaction
     from datetime import timezone
-    old_time = (datetime.now(timezone.utc) - timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S')
-    cur.execute('INSERT INTO audio_failures (video_id, start_frame, end_frame, attempts, error_message, created_at) VALUES (?, ?, ?, ?, ?, ?)', (1, 0, 10, 1, 'old', old_time))
-    cur.execute('INSERT INTO audio_failures (video_id, start_frame, end_frame, attempts, error_message) VALUES (?, ?, ?, ?, ?)', (1, 20, 30, 1, 'recent'))
-    conn.commit()
+    now = datetime.now(timezone.utc)
+    old_time = (now - timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S')
+    recent_time = now.strftime('%Y-%m-%d %H:%M:%S')
+    conn = database.get_db_connection()
+    with conn:
+        conn.executemany(
+            'INSERT INTO audio_failures (video_id, start_frame, end_frame, attempts, error_message, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            [(1, 0, 10, 1, 'old', old_time), (1, 20, 30, 1, 'recent', recent_time)],
+        )
     conn.close()
 
     deleted = database.purge_audio_failures_older_than(30)
@@ -29,3 +24,18 @@ def test_purge_audio_failures_older_than(tmp_path):
     remaining = database.get_audio_failures(limit=10, video_id=1)
     assert len([r for r in remaining if r['error_message'] == 'old']) == 0
     assert len([r for r in remaining if r['error_message'] == 'recent']) == 1
+
+
+def test_add_audio_failures_bulk(mem_db):
+
+    added = database.add_audio_failures_bulk([
+        {'video_id': 7, 'start_frame': 0, 'end_frame': 10, 'attempts': 2, 'error_message': 'first', 'tool': 'ffmpeg'},
+        {'video_id': 7, 'start_frame': 10, 'end_frame': 20, 'attempts': 1, 'error_message': 'second'},
+    ])
+    assert added == 2
+    assert database.add_audio_failures_bulk([]) == 0
+
+    rows = {r['error_message']: r for r in database.get_audio_failures(video_id=7)}
+    assert set(rows) == {'first', 'second'}
+    assert rows['first']['tool'] == 'ffmpeg'
+    assert rows['second']['tool'] is None
@@ -0,0 +1,19 @@
+import os
+
+import vid2doc.database as database
+
+
+def test_reset_db_recreates_empty_schema(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'reset.db')
+    monkeypatch.setattr(database, 'DATABASE_PATH', db_file)
+    database.init_db()
+    database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    # Leave an idle pooled connection on the old file
+    database.get_db_connection().close()
+
+    database.reset_db()
+
+    assert os.path.exists(db_file)
+    assert database.get_all_videos() == []
+    assert database.add_video('w.mp4', 'w.mp4', 1.0, 30.0) == 1
+    database.close_idle_connections(db_file)
@@ -0,0 +1,17 @@
+import vid2doc.database as database
+
+
+def test_set_final_texts_for_slides_applies_updates_in_order(mem_db):
+    video_id = database.add_video('v.mp4', 'v.mp4', 10.0, 30.0)
+    first = database.add_slide(video_id, 0, 0.0, 'a.jpg')
+    second = database.add_slide(video_id, 30, 1.0, 'b.jpg')
+    database.add_text_extract(first, 'original')
+
+    applied = database.set_final_texts_for_slides([(first, 'one'), (second, 'two'), (first, 'three')])
+    assert applied == 3
+    assert database.set_final_texts_for_slides([]) == 0
+
+    # The existing extract is updated; a slide without one gets a new extract
+    assert database.get_text_extract_by_slide(first)['final_text'] == 'three'
+    assert database.get_text_extract_by_slide(first)['original_text'] == 'original'
+    assert database.get_text_extract_by_slide(second)['final_text'] == 'two'
@@ -25,14 +25,16 @@ from unittest.mock import patch
 from vid2doc.video_processor import VideoProcessor
 from vid2doc.pdf_generator_improved import generate_pdf_from_video_id
 
+# Every class here shares TEST_DB in the working directory
+pytestmark = [pytest.mark.serial, pytest.mark.db]
+
 def setup_test_db():
     """Setup test database"""
     global DATABASE_PATH
     # Use test database
     import vid2doc.database as database
     database.DATABASE_PATH = TEST_DB
-    if os.path.exists(TEST_DB):
-        os.remove(TEST_DB)
+    cleanup_test_db()
     init_db()
     
     # Also initialize SQLAlchemy models
@@ -40,25 +42,32 @@ def setup_test_db():
     init_models()
 
 def cleanup_test_db():
-    """Cleanup test database"""
-    if os.path.exists(TEST_DB):
-        os.remove(TEST_DB)
+    """Cleanup test database, with its WAL and shared-memory files"""
+    import vid2doc.database as database
+    import vid2doc.models_sqlalchemy as models
+    # Pooled connections would keep the deleted files open (and recreate -wal/-shm)
+    database.close_idle_connections(TEST_DB)
+    if models.engine is not None:
+        models.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(TEST_DB + suffix)
+        except FileNotFoundError:
+            pass
 
+@pytest.mark.usefixtures('mem_db')
 class TestDatabase:
-    """Test database operations"""
-    
-    def setup_method(self):
-        setup_test_db()
-    
-    def teardown_method(self):
-        cleanup_test_db()
+    """Test database operations
+
+    Each test gets its own in-memory database from the `mem_db` fixture, so
+    there is no per-test file delete, fsync or init_models().
+    """
     
     def test_init_db(self):
         """Test database initialization"""
-        assert os.path.exists(TEST_DB)
+        import vid2doc.database as database
         
         # Check tables exist
-        import vid2doc.database as database
         conn = database.get_db_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -150,34 +159,44 @@ class TestVideoProcessing:
         if not os.path.exists(source_path):
             pytest.skip(f"Demo video not found at {source_path}")
 
+        import shutil
+        import subprocess
         import tempfile
-        import cv2
         temp_dir = tempfile.mkdtemp(prefix='demo_trim_')
         trimmed_path = os.path.join(temp_dir, 'trimmed_demo.mp4')
 
-        # Create a small ~2 second trim to speed up processing
-        cap = cv2.VideoCapture(source_path)
-        if not cap.isOpened():
-            pytest.skip(f"Failed to open source demo video at {source_path}")
+        # Create a small ~2 second trim to speed up processing. ffmpeg copies the
+        # streams without decoding; OpenCV re-encodes frame by frame as a fallback
+        if shutil.which('ffmpeg'):
+            subprocess.run(
+                ['ffmpeg', '-y', '-loglevel', 'error', '-ss', '0', '-t', '2',
+                 '-i', source_path, '-c', 'copy', trimmed_path],
+                check=True,
+            )
+        else:
+            import cv2
+            cap = cv2.VideoCapture(source_path)
+            if not cap.isOpened():
+                pytest.skip(f"Failed to open source demo video at {source_path}")
 
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 640)
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 360)
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        writer = cv2.VideoWriter(trimmed_path, fourcc, fps, (width, height))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 640)
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 360)
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            writer = cv2.VideoWriter(trimmed_path, fourcc, fps, (width, height))
 
-        # write only a small number of frames (~2 seconds)
-        frame_limit = int(fps * 2)
-        frames_written = 0
-        while frames_written < frame_limit:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            writer.write(frame)
-            frames_written += 1
+            # write only a small number of frames (~2 seconds)
+            frame_limit = int(fps * 2)
+            frames_written = 0
+            while frames_written < frame_limit:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                writer.write(frame)
+                frames_written += 1
 
-        cap.release()
-        writer.release()
+            cap.release()
+            writer.release()
 
         print("[manual test] Starting demo video processing (trimmed copy)...")
 
@@ -199,8 +218,8 @@ class TestVideoProcessing:
             "min_slide_audio_seconds": 0.0,
         }
 
-           with patch("vid2doc.video_audio_extraction.get_slide_text", side_effect=fake_get_slide_text), \
-               patch("vid2doc.video_audio_extraction.summrise_text", side_effect=fake_summrise_text):
+        with patch("vid2doc.video_audio_extraction.get_slide_text", side_effect=fake_get_slide_text), \
+             patch("vid2doc.video_audio_extraction.summrise_text", side_effect=fake_summrise_text):
             processor = VideoProcessor(trimmed_path, 'test_output')
             video_id = processor.process_video(settings=settings)
 
@@ -343,9 +362,10 @@ class TestPDFGeneration:
         import cv2
         import numpy as np
         
+        # One buffer, refilled for each slide
+        img = np.empty((480, 640, 3), dtype=np.uint8)
         for i in range(3):
             # Create a simple colored image
-            img = np.zeros((480, 640, 3), dtype=np.uint8)
             img[:] = (50 + i * 50, 100, 200)  # Different colors
             cv2.putText(img, f'Slide {i+1}', (50, 240), 
                        cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
@@ -1,18 +1,16 @@
-import io
 import os
-import time
+
+import pytest
 
 from vid2doc.app import app
 
+pytestmark = pytest.mark.db
 
-def test_text_samples_are_persisted():
-    client = app.test_client()
-    path = 'videos/small_demo_video.mp4'
-    assert os.path.exists(path), 'Test video missing'
 
-    with open(path, 'rb') as f:
-        data = {'video': (io.BytesIO(f.read()), os.path.basename(path))}
-        resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+def test_text_samples_are_persisted(wait_for_job, client, demo_video_path):
+    # The test client streams the open file into the multipart body and closes it afterwards
+    data = {'video': (open(demo_video_path, 'rb'), os.path.basename(demo_video_path))}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
     assert resp.status_code == 200
     payload = resp.get_json()
     file_id = payload['file_id']
@@ -23,15 +21,7 @@ def test_text_samples_are_persisted():
     job_id = resp2.get_json()['job_id']
 
     # Wait for completion
-    deadline = time.time() + 5
-    final = None
-    while time.time() < deadline:
-        r = client.get(f'/api/progress/{job_id}')
-        j = r.get_json()['job']
-        if j['status'] in ('completed', 'error', 'cancelled'):
-            final = j
-            break
-        time.sleep(0.05)
+    final = wait_for_job(client, job_id)
 
     assert final and final['status'] == 'completed'
 
@@ -39,15 +29,12 @@ def test_text_samples_are_persisted():
     assert final.get('sample_count', 0) >= 1
     assert final.get('samples_persisted', 0) >= 1
 
-    # Ensure extracts panel has entries and that DB contains persisted text for slides
-    from vid2doc.database import get_video_slides, get_text_extract_by_slide
+    # Ensure extracts panel has entries and that DB contains persisted text for slides.
+    # get_video_slides already joins each slide's text extract, so no per-slide query is needed
+    from vid2doc.database import get_video_slides
     slides = get_video_slides(final['video_id'])
     assert len(slides) >= 1
 
-    persisted = 0
-    for s in slides:
-        txt = get_text_extract_by_slide(s['id'])
-        if txt and (txt['original_text'] or txt['suggested_text'] or txt['final_text']):
-            persisted += 1
+    persisted = sum(1 for s in slides if s['original_text'] or s['suggested_text'] or s['final_text'])
 
     assert persisted >= 1, 'No text extracts found for processed slides'
\ No newline at end of file
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from vid2doc.app import TEXT_SAMPLE_MAX_AGE, _start_processing_job, job_done_events, processing_jobs
+
+pytestmark = pytest.mark.db
+
+
+class SamplingProcessor:
+    def __init__(self, path, out):
+        pass
+
+    def process_video(self, settings, progress_callback, should_cancel):
+        progress_callback({'type': 'started', 'total_frames': 10, 'fps': 10, 'video_id': 1})
+        for slide_id in (1, 2, 3):
+            progress_callback({'type': 'slide_created', 'slide_id': slide_id})
+            progress_callback({'type': 'text_sample', 'sample': f'text {slide_id}', 'source_frame': slide_id})
+        progress_callback({'type': 'complete', 'video_id': 1})
+
+
+def test_failed_sample_batch_falls_back_to_single_writes(monkeypatch):
+    written = []
+
+    def fail_batch(updates, is_locked=False):
+        raise RuntimeError('slide 2 is gone')
+
+    def write_one(slide_id, text, is_locked=False):
+        if slide_id == 2:
+            raise RuntimeError('slide 2 is gone')
+        written.append((slide_id, text))
+
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', SamplingProcessor)
+    monkeypatch.setattr('vid2doc.app.set_final_texts_for_slides', fail_batch)
+    monkeypatch.setattr('vid2doc.app.set_final_text_for_slide', write_one)
+
+    job_id = _start_processing_job('uploads/test_small.mp4', {})
+    assert job_done_events[job_id].wait(5)
+
+    assert written == [(1, 'text 1'), (3, 'text 3')]
+    assert processing_jobs[job_id]['samples_persisted'] == 2
+
+
+def test_old_pending_samples_are_flushed_before_the_batch_fills(monkeypatch):
+    batches = []
+    flushed_before_complete = []
+
+    class SlowProcessor:
+        def __init__(self, path, out):
+            pass
+
+        def process_video(self, settings, progress_callback, should_cancel):
+            progress_callback({'type': 'started', 'total_frames': 10, 'fps': 10, 'video_id': 1})
+            progress_callback({'type': 'slide_created', 'slide_id': 1})
+            progress_callback({'type': 'text_sample', 'sample': 'early', 'source_frame': 1})
+            time.sleep(TEXT_SAMPLE_MAX_AGE * 1.5)
+            progress_callback({'type': 'status', 'frames': 5, 'total_frames': 10})
+            flushed_before_complete.extend(batches)
+            progress_callback({'type': 'complete', 'video_id': 1})
+
+    def record_batch(updates, is_locked=False):
+        batches.append(list(updates))
+        return len(updates)
+
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', SlowProcessor)
+    monkeypatch.setattr('vid2doc.app.set_final_texts_for_slides', record_batch)
+
+    job_id = _start_processing_job('uploads/test_small.mp4', {})
+    assert job_done_events[job_id].wait(5)
+
+    assert flushed_before_complete == [[(1, 'early')]]
+    assert processing_jobs[job_id]['samples_persisted'] == 1
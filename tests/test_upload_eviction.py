@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from vid2doc.app import _remember_upload, _start_processing_job, job_done_events, uploaded_files
+
+pytestmark = pytest.mark.db
+
+
+def test_evicted_upload_is_kept_until_its_job_finishes(monkeypatch, tmp_path):
+    release = threading.Event()
+
+    class BlockingProcessor:
+        def __init__(self, path, out):
+            pass
+
+        def process_video(self, settings, progress_callback, should_cancel):
+            release.wait(5)
+
+    monkeypatch.setattr('vid2doc.app.VideoProcessor', BlockingProcessor)
+    monkeypatch.setattr('vid2doc.app.MAX_TRACKED_UPLOADS', 1)
+    monkeypatch.setattr('vid2doc.app.uploaded_files', type(uploaded_files)())
+
+    busy = tmp_path / 'busy.mp4'
+    idle = tmp_path / 'idle.mp4'
+    busy.write_bytes(b'x')
+    idle.write_bytes(b'x')
+    _remember_upload('busy', {'path': str(busy)})
+    job_id = _start_processing_job(str(busy), {}, file_id='busy')
+
+    # Evicts 'busy' while its job runs, then 'idle' which nothing uses
+    _remember_upload('idle', {'path': str(idle)})
+    _remember_upload('new', {'path': str(tmp_path / 'new.mp4')})
+    assert busy.exists()
+    assert not idle.exists()
+
+    release.set()
+    assert job_done_events[job_id].wait(5)
+    assert not busy.exists()
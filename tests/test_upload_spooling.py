@@ -0,0 +1,34 @@
+import io
+import os
+import stat
+
+import pytest
+
+from vid2doc.app import app, uploaded_files
+
+pytestmark = pytest.mark.db
+
+
+def test_upload_is_renamed_into_place_without_leftover_spool_files(client, tmp_path, monkeypatch):
+    upload_folder = tmp_path / 'uploads'
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(upload_folder))
+    data = {'video': (io.BytesIO(b'\0' * (2 * 1024 * 1024)), 'clip.mp4')}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+    assert resp.status_code == 200
+
+    path = uploaded_files[resp.get_json()['file_id']]['path']
+    assert os.path.dirname(path) == str(upload_folder)
+    assert os.path.getsize(path) == 2 * 1024 * 1024
+    # The spool file became the upload itself; nothing else is left behind
+    assert os.listdir(upload_folder) == [os.path.basename(path)]
+    if os.name == 'posix':
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_rejected_upload_leaves_no_spool_file(client, tmp_path, monkeypatch):
+    upload_folder = tmp_path / 'uploads'
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(upload_folder))
+    data = {'video': (io.BytesIO(b'not a video'), 'notes.txt')}
+    resp = client.post('/api/upload', data=data, content_type='multipart/form-data')
+    assert resp.status_code == 400
+    assert os.listdir(upload_folder) == []
@@ -6,27 +6,33 @@ as a package (``python -m vid2doc``). The Flask app is defined in
 """
 from __future__ import annotations
 
-import importlib
+from functools import lru_cache
 
+# Attributes looked up on vid2doc.app
+_CREATE_APP = 'create_app'
+_APP_ATTR = 'app'
 
+
+@lru_cache(maxsize=1)
 def create_app() -> "Flask":
     """Create or return the Flask application instance.
 
     Resolution order:
     1. If `vid2doc.app` exists and defines `create_app`, call it.
     2. If `vid2doc.app` defines `app`, return that.
+
+    The result is cached, so later calls return the same instance.
     """
-    # Package-local app module
-    try:
-        mod = importlib.import_module('vid2doc.app')
-    except ModuleNotFoundError:
-        mod = None
-
-    if mod is not None:
-        if hasattr(mod, 'create_app'):
-            return getattr(mod, 'create_app')()
-        if hasattr(mod, 'app'):
-            return getattr(mod, 'app')
+    # Imported here rather than at package import: vid2doc.app pulls in Flask and the
+    # video processing stack, which `import vid2doc.database` shouldn't have to load
+    from . import app as app_module
+
+    factory = getattr(app_module, _CREATE_APP, None)
+    if factory is not None:
+        return factory()
+    app = getattr(app_module, _APP_ATTR, None)
+    if app is not None:
+        return app
 
     raise RuntimeError('Could not locate Flask application (create_app or app) in vid2doc.app')
 
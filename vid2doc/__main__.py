@@ -1,19 +1,32 @@
 """Module entrypoint for `python -m vid2doc`.
 
-Runs the Flask development server using the package's `create_app()`.
-This is a thin convenience wrapper intended for development only.
+Runs the package's `create_app()` on Flask's development server, or on
+waitress when ``VID2DOC_SERVER=waitress`` (``pip install waitress``; thread
+count from ``THREADS``, default 8). Every open ``/api/job/<id>/stream`` holds
+one of those threads for up to ``JOB_STREAM_MAX_LIFETIME`` seconds, so allow
+a few more threads than the number of pages expected to watch jobs at once.
 """
 from __future__ import annotations
 
 import os
 from . import create_app
 
+_HOST = os.environ.get('HOST', '0.0.0.0')
+_PORT = int(os.environ.get('PORT', '5000'))
+
 
 def run() -> None:
     app = create_app()
-    host = os.environ.get('HOST', '0.0.0.0')
-    port = int(os.environ.get('PORT', '5000'))
-    app.run(host=host, port=port)
+    environ = os.environ
+    host, port = _HOST, _PORT
+    server = environ.get('VID2DOC_SERVER', 'flask').lower()
+    if server == 'waitress':
+        from waitress import serve
+        serve(app, host=host, port=port, threads=int(environ.get('THREADS', '8')))
+    elif server == 'flask':
+        app.run(host=host, port=port)
+    else:
+        raise SystemExit(f"Unknown VID2DOC_SERVER {server!r} (expected 'flask' or 'waitress')")
 
 
 if __name__ == '__main__':
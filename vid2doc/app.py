@@ -20,20 +20,35 @@ from flask import (
     jsonify,
     abort,
     Response,
+    current_app,
 )
+from flask.wrappers import Request
 import os
+import re
 import shutil
+import tempfile
 from werkzeug.utils import secure_filename
+import atexit
 import logging
+import numbers
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 import time
-from copy import deepcopy
+from collections import OrderedDict, deque
+from itertools import islice
 import csv
 import io
+import json
+
+try:  # optional: faster serialisation for the frequently polled job endpoints
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 from vid2doc.database import (
     init_db,
+    reset_db,
     get_audio_failures,
     get_video_slides,
     create_section,
@@ -47,16 +62,53 @@ from vid2doc.database import (
     get_all_videos,
     update_video_document,
     add_text_extract,
-    get_all_slides_for_export,
+    iter_slides_for_export,
     set_final_text_for_slide,
+    set_final_texts_for_slides,
     get_db_connection,
 )
+from vid2doc import database as db_module
 from vid2doc.video_processor import VideoProcessor, PREVIEW_FRAME_INTERVAL
 from vid2doc.video_processing import get_video_properties
 from vid2doc.pdf_generator_improved import generate_pdf_from_video_id
 
+class UploadRequest(Request):
+    """Request that spools uploaded files into the upload folder.
+
+    Werkzeug's default parser spools large files to the system temp dir, so
+    saving an upload meant copying every byte a second time. Spooling next to
+    the final location lets api_upload rename the file into place instead.
+    Spooled files that are not claimed are removed when the request closes.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        os.makedirs(folder, exist_ok=True)
+        stream = tempfile.NamedTemporaryFile(dir=folder, prefix='.upload-', suffix='.part', delete=False)
+        # mkstemp creates the file 0600; give the renamed upload the usual file.save() mode
+        os.chmod(stream.name, 0o644)
+        self.__dict__.setdefault('_spooled_paths', set()).add(stream.name)
+        return stream
+
+    def spooled_path(self, file) -> str | None:
+        """Return the on-disk spool path of an uploaded `FileStorage`, if it has one."""
+        name = getattr(file.stream, 'name', None)
+        return name if name in self.__dict__.get('_spooled_paths', ()) else None
+
+    def close(self) -> None:
+        super().close()
+        for path in self.__dict__.get('_spooled_paths', ()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
 _template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
 app = Flask(__name__, template_folder=_template_dir)
+app.request_class = UploadRequest
 # Load secret key from environment for safe open-source defaults.
 # Prefer `FLASK_SECRET_KEY` or `SECRET_KEY`. If not set, fall back to a random key
 # and log a warning so developers know to set a persistent secret in production.
@@ -69,6 +121,10 @@ else:
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'output'
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
+# Behind Apache (mod_xsendfile) or lighttpd, set VID2DOC_X_SENDFILE=1 so files from
+# /output/ are sent by the web server via an X-Sendfile header instead of being
+# streamed through Python
+app.config['USE_X_SENDFILE'] = os.environ.get('VID2DOC_X_SENDFILE', '0').lower() in ('1', 'true', 'yes')
 # Optional deterministic wav filename pattern. Supports placeholders: {video_id}, {base}, {prev}, {frame}
 # Example: "{video_id}/{base}-{prev}-{frame}.wav"
 app.config.setdefault('WAV_FILENAME_PATTERN', '{video_id}/{base}-{prev}-{frame}.wav')
@@ -77,79 +133,281 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 # Allowed video extensions
 ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv'}
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_EXTENSIONS)
+
+
+def _json_response(payload, status: int = 200):
+    """Like jsonify(payload), but serialised with orjson when it is installed."""
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
 
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+
+# Both maps keep insertion order so the oldest entries can be evicted once they
+# exceed MAX_TRACKED_JOBS / MAX_TRACKED_UPLOADS (see _remember_job/_remember_upload)
+processing_jobs = OrderedDict()
+# job_id -> threading.Event set once the job's worker has finished (any final status).
+# Kept outside the job dict so the job stays JSON-serialisable for /api/progress.
+job_done_events = {}
+# Notified after every recorded progress event so /api/job/<id>/stream can push it
+job_updates = threading.Condition()
+FINAL_JOB_STATUSES = ('completed', 'error', 'cancelled')
+# Seconds between keep-alive comments on an idle job stream
+JOB_STREAM_KEEPALIVE = 15
+# Seconds after which a job stream is closed even if the job is still running. Each
+# open stream holds a server thread; the page then falls back to polling /api/progress
+JOB_STREAM_MAX_LIFETIME = 300
+uploaded_files = OrderedDict()
+MAX_TRACKED_JOBS = 256
+MAX_TRACKED_UPLOADS = 256
+# Guards processing_jobs/uploaded_files and the fields, logs and extracts of each job.
+# Never held while waiting on job_updates or touching the database. Re-entrant so
+# progress events can update several fields and append a log entry atomically.
+jobs_lock = threading.RLock()
+# Processing jobs run on a bounded worker pool; extra jobs wait in its queue with
+# status "queued" instead of all competing for the CPU/GPU at once
+MAX_CONCURRENT_JOBS = max(1, int(os.environ.get('VID2DOC_MAX_CONCURRENT_JOBS', '2')))
+job_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix='vid2doc-job')
+# Probes video properties after upload so /api/upload can answer without waiting for it
+properties_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='vid2doc-probe')
+
+
+def _stop_job_workers():
+    """Let the interpreter exit without first working through the job queue.
+
+    Executor threads are joined at exit, so queued jobs are dropped and running
+    ones are asked to cancel (they stop at the processor's next should_cancel check).
+    """
+    with jobs_lock:
+        for jid, job in processing_jobs.items():
+            if jid in job_done_events and not job_done_events[jid].is_set():
+                job['cancel_requested'] = True
+    job_executor.shutdown(wait=False, cancel_futures=True)
+    properties_executor.shutdown(wait=False, cancel_futures=True)
 
 
-processing_jobs = {}
-uploaded_files = {}
-jobs_lock = threading.Lock()
+# concurrent.futures joins its workers from a threading exit hook, which runs before
+# atexit callbacks; hooks registered there run last-registered first, so this one
+# goes ahead of the join
+getattr(threading, '_register_atexit', atexit.register)(_stop_job_workers)
 
 MAX_LOG_ENTRIES = 200
 MAX_EXTRACTS = 10
+# Text samples are written to the database in transactions of up to this many, so
+# a job's samples_persisted trails sample_count by less than this until a flush
+TEXT_SAMPLE_BATCH = 20
+# ...or once the oldest waiting sample is this many seconds old, so slow jobs still
+# show their text promptly
+TEXT_SAMPLE_MAX_AGE = 0.1
+# Rows formatted per writerows() call, and so per chunk, of the CSV export
+CSV_EXPORT_BATCH = 500
 
-# Initialize database
-init_db()
-
-# Create required directories
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
-os.makedirs('wav', exist_ok=True)
+_app_initialized = False
+_app_init_lock = threading.Lock()
 
 
 def create_app():
-    """Return the Flask application instance.
+    """Return the Flask application instance, running its start-up work once.
 
-    This minimal factory exists to ease migration into a package layout.
-    It returns the module-level `app` which is already configured during import,
-    preserving current behavior for other modules that import `app`.
+    Importing this module only defines `app` and its routes. The database
+    init, working folders, optional uploads clean-up and placeholder image
+    happen on the first call here, which every entrypoint (``python -m
+    vid2doc``, `vid2doc.wsgi`, ``flask --app vid2doc:create_app``) makes.
     """
+    global _app_initialized
+    with _app_init_lock:
+        if not _app_initialized:
+            _initialize_app()
+            _app_initialized = True
     return app
 
 
-def _start_processing_job(upload_path: str, settings: dict) -> str:
+def _initialize_app():
+    global _PLACEHOLDER_REL
+    init_db()
+
+    # Create required directories
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
+    os.makedirs('wav', exist_ok=True)
+
+    # Optionally clear uploads directory on server start to avoid filling disk.
+    # Controlled by environment variable `VID2DOC_CLEAR_UPLOADS_ON_START` (default: true).
+    # Also skip when running under pytest (PYTEST_CURRENT_TEST is set by pytest) to avoid
+    # interfering with test fixtures.
+    clear_on_start = os.environ.get('VID2DOC_CLEAR_UPLOADS_ON_START', 'true').lower() in ('1', 'true', 'yes')
+    if clear_on_start and 'PYTEST_CURRENT_TEST' not in os.environ:
+        try:
+            _clear_directory_contents(app.config['UPLOAD_FOLDER'], keep_names={'.gitkeep', 'README.md'})
+        except Exception:
+            logging.exception('Failed to clear uploads directory on startup')
+
+    # The placeholder never changes, so it is created once at start-up and uploads
+    # only build its URL from this path (relative to OUTPUT_FOLDER)
+    placeholder_path = _ensure_placeholder_image()
+    if placeholder_path:
+        _PLACEHOLDER_REL = os.path.relpath(placeholder_path, app.config.get('OUTPUT_FOLDER', 'output'))
+
+
+def _remember_job(job_id: str, job: dict, done_event: threading.Event) -> None:
+    """Register a job, forgetting the oldest finished jobs beyond MAX_TRACKED_JOBS.
+
+    Jobs that are still queued or running are never evicted.
+    """
+    with jobs_lock:
+        processing_jobs[job_id] = job
+        job_done_events[job_id] = done_event
+        excess = len(processing_jobs) - MAX_TRACKED_JOBS
+        if excess > 0:
+            finished = [jid for jid in processing_jobs if jid in job_done_events and job_done_events[jid].is_set()]
+            for jid in finished[:excess]:
+                del processing_jobs[jid]
+                job_done_events.pop(jid, None)
+
+
+def _remember_upload(file_id: str, info: dict) -> None:
+    """Register an upload, evicting the oldest beyond MAX_TRACKED_UPLOADS.
+
+    Evicted uploads can no longer be processed, so their files are deleted too.
+    A file that an unfinished job is still using is left to that job, which
+    deletes it when it finishes (see _finish_job).
+    """
+    stale_paths = []
+    with jobs_lock:
+        uploaded_files[file_id] = info
+        excess = len(uploaded_files) - MAX_TRACKED_UPLOADS
+        if excess > 0:
+            in_use = {}
+            for jid, job in processing_jobs.items():
+                if jid in job_done_events and not job_done_events[jid].is_set():
+                    in_use.setdefault(job.get('file_id'), []).append(job)
+            for fid in list(uploaded_files)[:excess]:
+                evicted = uploaded_files.pop(fid)
+                if not evicted.get('path'):
+                    continue
+                if fid in in_use:
+                    for job in in_use[fid]:
+                        job['evicted_upload_path'] = evicted['path']
+                else:
+                    stale_paths.append(evicted['path'])
+    for path in stale_paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logging.exception('Failed to remove evicted upload %s', path)
+
+
+def _finish_job(job: dict, done_event: threading.Event) -> None:
+    """Mark a job's worker as finished and wake anyone waiting on job updates.
+
+    If the job's upload was evicted while it ran, the last unfinished job using
+    it deletes the file. Setting the event and checking the other jobs happen
+    under one lock, so two jobs finishing together can't both leave it behind.
+    """
+    with jobs_lock:
+        done_event.set()
+        path = job.pop('evicted_upload_path', None)
+        if path is not None and any(
+            other.get('evicted_upload_path') == path and not job_done_events[jid].is_set()
+            for jid, other in processing_jobs.items() if jid in job_done_events
+        ):
+            path = None
+    if path is not None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logging.exception('Failed to remove evicted upload %s', path)
+    with job_updates:
+        job_updates.notify_all()
+
+
+def _start_processing_job(upload_path: str, settings: dict, file_id: str | None = None) -> str:
     """Start a background processing job and return its job id.
 
     This is a minimal, test-friendly implementation that records progress
     events emitted via the processor's `progress_callback` into the
     `processing_jobs` map so tests can poll `/api/progress/<job_id>`.
+    `file_id` is the upload being processed; it keeps the file from being
+    deleted by upload eviction while the job runs.
     """
-    job_id = str(uuid4())
+    job_id = uuid4().hex
     job = {
         "id": job_id,
+        "file_id": file_id,
         "status": "queued",
         "percent_complete": 0.0,
-        "logs": [],
-        "extracts": [],
+        # Ring buffers: the oldest entries drop off once the cap is reached
+        "logs": deque(maxlen=MAX_LOG_ENTRIES),
+        "extracts": deque(maxlen=MAX_EXTRACTS),
         "gpu_diagnostics": {},
         "sample_count": 0,
         "samples_persisted": 0,
         "empty_samples": 0,
     }
 
-    processing_jobs[job_id] = job
+    done_event = threading.Event()
+    _remember_job(job_id, job, done_event)
 
     def _append_log(message: str, frame: int | None = None):
-        entry = {"message": message, "frame": frame, "timestamp": time.time()}
-        job["logs"].append(entry)
-        if len(job["logs"]) > MAX_LOG_ENTRIES:
-            job["logs"] = job["logs"][-MAX_LOG_ENTRIES:]
+        # Integer wall-clock milliseconds: cheaper to produce and to serialise than a float
+        entry = {"message": message, "frame": frame, "timestamp_ms": time.time_ns() // 1_000_000}
+        with jobs_lock:
+            # seq keeps counting past MAX_LOG_ENTRIES trimming so streams can resume after it
+            job["log_seq"] = entry["seq"] = job.get("log_seq", 0) + 1
+            job["logs"].append(entry)
+
+    # (slide_id, text) pairs waiting to be written by _flush_text_samples
+    pending_texts = []
+    # time.monotonic() at which the oldest of pending_texts was queued
+    pending_since = None
+
+    def _flush_text_samples():
+        nonlocal pending_since
+        if not pending_texts:
+            return
+        batch = pending_texts[:]
+        pending_texts.clear()
+        pending_since = None
+        try:
+            persisted = set_final_texts_for_slides(batch, is_locked=False)
+        except Exception:
+            # One bad row (e.g. a slide deleted meanwhile) rolls back the whole
+            # batch; retry row by row so only that sample is lost
+            logging.warning('Batched text sample write failed; retrying %d samples one by one', len(batch), exc_info=True)
+            persisted = 0
+            for slide_id, text in batch:
+                try:
+                    set_final_text_for_slide(slide_id, text, is_locked=False)
+                    persisted += 1
+                except Exception:
+                    logging.exception('Failed to persist text sample for slide %s', slide_id)
+        with jobs_lock:
+            job["samples_persisted"] = job.get("samples_persisted", 0) + persisted
 
     def _append_extract(frame: int | None, timestamp: float | None, text: str | None):
         entry = {"frame": frame, "timestamp": timestamp, "text": text}
-        job["extracts"].append(entry)
-        if len(job["extracts"]) > MAX_EXTRACTS:
-            job["extracts"] = job["extracts"][-MAX_EXTRACTS:]
+        with jobs_lock:
+            job["extracts"].append(entry)
+
+    # Resolved once per job rather than on every preview event. The trailing
+    # separator keeps e.g. /srv/outputs from matching /srv/output
+    output_root = os.path.abspath(app.config.get("OUTPUT_FOLDER", "output"))
+    output_prefix = os.path.join(output_root, '')
 
     def _resolve_preview_url(image_path: str | None) -> str | None:
         if not image_path:
             return None
         try:
-            output_root = os.path.abspath(app.config.get("OUTPUT_FOLDER", "output"))
             abs_path = os.path.abspath(image_path)
-            if abs_path.startswith(output_root):
+            if abs_path.startswith(output_prefix):
                 rel = os.path.relpath(abs_path, output_root)
                 return url_for('output_file', filename=rel)
             if image_path.startswith('output'):
@@ -175,76 +433,109 @@ def _start_processing_job(upload_path: str, settings: dict) -> str:
 
     def run_job():
         def progress_callback(event: dict):
+            nonlocal pending_since
             try:
                 etype = event.get("type")
                 if etype == "status":
-                    _append_log(event.get("message", ""), event.get("frames"))
-                    if event.get("frames") is not None and event.get("total_frames"):
-                        try:
-                            job["percent_complete"] = min(100.0, float(event.get("frames", 0)) / float(event.get("total_frames", 1)) * 100.0)
-                        except Exception:
-                            pass
+                    frames = event.get("frames")
+                    percent = _percent_of(frames, event.get("total_frames"))
+                    with jobs_lock:
+                        _append_log(event.get("message", ""), frames)
+                        if percent is not None:
+                            job["percent_complete"] = percent
                 elif etype == "started":
-                    job["status"] = "running"
-                    if event.get("total_frames") is not None:
-                        job["total_frames"] = event.get("total_frames")
-                    if event.get("fps") is not None:
-                        job["fps"] = event.get("fps")
-                    if event.get("video_id") is not None:
-                        job["video_id"] = event.get("video_id")
-                    _append_log("Processing started")
+                    with jobs_lock:
+                        job["status"] = "running"
+                        if event.get("total_frames") is not None:
+                            job["total_frames"] = event.get("total_frames")
+                        if event.get("fps") is not None:
+                            job["fps"] = event.get("fps")
+                        if event.get("video_id") is not None:
+                            job["video_id"] = event.get("video_id")
+                        _append_log("Processing started")
                 elif etype == "progress":
-                    if event.get("frames_processed") is not None:
-                        job["frames_processed"] = event.get("frames_processed")
-                    if event.get("percent_complete") is not None:
-                        job["percent_complete"] = event.get("percent_complete")
-                    elif job.get("total_frames") and event.get("frames_processed") is not None:
-                        try:
-                            job["percent_complete"] = min(100.0, float(event.get("frames_processed", 0)) / float(job.get("total_frames", 1)) * 100.0)
-                        except Exception:
-                            pass
+                    frames_processed = event.get("frames_processed")
+                    with jobs_lock:
+                        if frames_processed is not None:
+                            job["frames_processed"] = frames_processed
+                        if event.get("percent_complete") is not None:
+                            job["percent_complete"] = event.get("percent_complete")
+                        else:
+                            percent = _percent_of(frames_processed, job.get("total_frames"))
+                            if percent is not None:
+                                job["percent_complete"] = percent
                 elif etype == "preview":
-                    job["preview_frame"] = event.get("frame")
-                    job["preview_timestamp"] = event.get("timestamp")
-                    job["preview_image_url"] = _resolve_preview_url(event.get("image_path"))
+                    preview_url = _resolve_preview_url(event.get("image_path"))
+                    with jobs_lock:
+                        job["preview_frame"] = event.get("frame")
+                        job["preview_timestamp"] = event.get("timestamp")
+                        job["preview_image_url"] = preview_url
+                elif etype == "slide_created":
+                    # Processors that announce new slides spare text_sample a DB lookup
+                    if event.get("slide_id") is not None:
+                        with jobs_lock:
+                            job["latest_slide_id"] = event.get("slide_id")
                 elif etype == "text_sample":
                     sample = event.get("sample")
                     frame = event.get("source_frame")
-                    job["sample_count"] = job.get("sample_count", 0) + 1
-                    if not sample:
-                        job["empty_samples"] = job.get("empty_samples", 0) + 1
-                    ts = None
-                    try:
-                        if frame is not None and job.get("fps"):
-                            ts = float(frame) / float(job.get("fps", 1))
-                    except Exception:
+                    with jobs_lock:
+                        job["sample_count"] = job.get("sample_count", 0) + 1
+                        if not sample:
+                            job["empty_samples"] = job.get("empty_samples", 0) + 1
                         ts = None
-                    _append_extract(frame, ts, sample)
-                    # Persist the sample text to the latest slide for this video
+                        try:
+                            if frame is not None and job.get("fps"):
+                                ts = float(frame) / float(job.get("fps", 1))
+                        except Exception:
+                            ts = None
+                        _append_extract(frame, ts, sample)
+                    # Queue the sample text for the latest slide of this video; it is
+                    # written with the rest of its batch
                     try:
-                        slide_id = _get_latest_slide_id(job.get("video_id"))
+                        slide_id = job.get("latest_slide_id")
+                        if slide_id is None:
+                            slide_id = _get_latest_slide_id(job.get("video_id"))
                         if slide_id is not None and sample is not None:
-                            set_final_text_for_slide(slide_id, sample, is_locked=False)
-                            job["samples_persisted"] = job.get("samples_persisted", 0) + 1
+                            if not pending_texts:
+                                pending_since = time.monotonic()
+                            pending_texts.append((slide_id, sample))
                     except Exception:
                         logging.exception('Failed to persist text sample')
                 elif etype == "complete":
-                    job["status"] = "completed"
-                    job["percent_complete"] = 100.0
-                    if "video_id" in event:
-                        job["video_id"] = event["video_id"]
-                        job["edit_url"] = f"/video/{event['video_id']}"
-                    _append_log("Processing completed")
+                    # Persist what is left before the job is reported as done
+                    _flush_text_samples()
+                    with jobs_lock:
+                        job["status"] = "completed"
+                        job["percent_complete"] = 100.0
+                        if "video_id" in event:
+                            job["video_id"] = event["video_id"]
+                            job["edit_url"] = f"/video/{event['video_id']}"
+                        _append_log("Processing completed")
                 elif etype == "cancelled":
-                    job["status"] = "cancelled"
-                    if event.get("percent_complete") is not None:
-                        job["percent_complete"] = event.get("percent_complete")
-                    _append_log("Processing cancelled")
+                    _flush_text_samples()
+                    with jobs_lock:
+                        job["status"] = "cancelled"
+                        if event.get("percent_complete") is not None:
+                            job["percent_complete"] = event.get("percent_complete")
+                        _append_log("Processing cancelled")
                 # allow other event types to be recorded as logs
                 elif etype:
                     _append_log(str(event))
+                if pending_texts and (len(pending_texts) >= TEXT_SAMPLE_BATCH
+                                      or time.monotonic() - pending_since >= TEXT_SAMPLE_MAX_AGE):
+                    _flush_text_samples()
             except Exception:
                 _append_log("error processing progress event")
+            with job_updates:
+                job_updates.notify_all()
+
+        if job.get("cancel_requested"):
+            # Cancelled while still waiting in the queue
+            with jobs_lock:
+                job["status"] = "cancelled"
+                _append_log("Processing cancelled")
+            _finish_job(job, done_event)
+            return
 
         try:
             # Instantiate and run the processor. Use positional args to match tests' DummyProcessor.
@@ -253,11 +544,16 @@ def _start_processing_job(upload_path: str, settings: dict) -> str:
             # Pass `should_cancel=None` to satisfy implementations that require the third parameter.
             processor.process_video(settings=settings, progress_callback=progress_callback, should_cancel=lambda: bool(job.get("cancel_requested")))
         except Exception as exc:  # record failure
-            job["status"] = "error"
-            _append_log(str(exc))
-
-    t = threading.Thread(target=run_job, daemon=True)
-    t.start()
+            with jobs_lock:
+                job["status"] = "error"
+                _append_log(str(exc))
+        finally:
+            _flush_text_samples()
+            # The job may have added the newest video with slides
+            _invalidate_nav_cache()
+            _finish_job(job, done_event)
+
+    job_executor.submit(run_job)
     return job_id
 
 
@@ -281,6 +577,10 @@ def _ensure_placeholder_image() -> str | None:
         return None
 
 
+# Set by create_app(): the upload placeholder image, relative to OUTPUT_FOLDER
+_PLACEHOLDER_REL = None
+
+
 @app.route('/output/<path:filename>')
 def output_file(filename):
     """Serve files from the output directory."""
@@ -299,36 +599,43 @@ def api_upload():
     if not allowed_file(filename):
         return jsonify({'success': False, 'message': 'Unsupported file type'}), 400
 
-    file_id = str(uuid4())
+    file_id = uuid4().hex
     os.makedirs(app.config.get('UPLOAD_FOLDER', 'uploads'), exist_ok=True)
     storage_name = f"{file_id}_{filename}"
     upload_path = os.path.join(app.config.get('UPLOAD_FOLDER', 'uploads'), storage_name)
 
     try:
-        file.save(upload_path)
+        spooled = request.spooled_path(file)
+        if spooled:
+            # Already on disk in the upload folder: close it and rename into place
+            file.stream.close()
+            os.replace(spooled, upload_path)
+        else:
+            file.save(upload_path)
     except Exception as exc:
         logging.exception('Failed to save uploaded file')
         return jsonify({'success': False, 'message': f'Failed to save file: {exc}'}), 500
 
-    properties = {}
-    try:
-        properties = get_video_properties(upload_path)
-    except Exception as exc:
-        logging.warning('Unable to read video properties: %s', exc)
-
-    uploaded_files[file_id] = {
+    # Reading the properties can take seconds on a large file; clients fetch them
+    # from /api/upload/<file_id>/properties once the probe finishes
+    upload_info = {
         'path': upload_path,
         'filename': filename,
-        'properties': properties,
+        'properties': None,
         'uploaded_at': time.time(),
     }
-
-    preview_path = _ensure_placeholder_image()
+    future = properties_executor.submit(get_video_properties, upload_path)
+    upload_info['properties_future'] = future
+    future.add_done_callback(lambda f: _store_upload_properties(upload_info, f))
+    _remember_upload(file_id, upload_info)
+
+    if app.debug:
+        # Recreate it if it was deleted while developing
+        _ensure_placeholder_image()
     preview_url = None
-    if preview_path:
+    if _PLACEHOLDER_REL:
         try:
-            rel = os.path.relpath(preview_path, app.config.get('OUTPUT_FOLDER', 'output'))
-            preview_url = url_for('output_file', filename=rel)
+            preview_url = url_for('output_file', filename=_PLACEHOLDER_REL)
         except Exception:
             preview_url = None
 
@@ -336,30 +643,54 @@ def api_upload():
         'success': True,
         'file_id': file_id,
         'filename': filename,
-        'properties': properties,
+        'properties_url': url_for('api_upload_properties', file_id=file_id),
         'preview_url': preview_url,
     })
 
 
+def _store_upload_properties(upload_info: dict, future) -> None:
+    try:
+        properties = future.result()
+    except Exception as exc:
+        logging.warning('Unable to read video properties: %s', exc)
+        properties = {}
+    with jobs_lock:
+        upload_info['properties'] = properties
+
+
+@app.route('/api/upload/<file_id>/properties')
+def api_upload_properties(file_id: str):
+    """Return an upload's video properties, or 202 while they are still being read."""
+    with jobs_lock:
+        upload_info = uploaded_files.get(file_id)
+        properties = upload_info.get('properties') if upload_info else None
+    if upload_info is None:
+        return jsonify({'success': False, 'message': 'Unknown file_id'}), 404
+    if properties is None:
+        return jsonify({'success': True, 'ready': False}), 202
+    return jsonify({'success': True, 'ready': True, 'properties': properties})
+
+
 @app.route('/api/process', methods=['POST'])
 def api_process():
     """Start processing for a previously uploaded file."""
     payload = request.get_json(silent=True) or {}
     file_id = payload.get('file_id')
     settings = payload.get('settings') or {}
-    if not file_id or file_id not in uploaded_files:
+    with jobs_lock:
+        upload_info = uploaded_files.get(file_id) if file_id else None
+    if upload_info is None:
         return jsonify({'success': False, 'message': 'Unknown file_id'}), 400
-    upload_info = uploaded_files[file_id]
     upload_path = upload_info.get('path')
     if not upload_path or not os.path.exists(upload_path):
         return jsonify({'success': False, 'message': 'Uploaded file not found'}), 404
 
-    job_id = _start_processing_job(upload_path, settings)
-    job = processing_jobs.get(job_id)
-    if job is not None:
-        job['file_id'] = file_id
-        job['filename'] = upload_info.get('filename')
-        job['method'] = settings.get('extraction_method') or settings.get('method') or 'default'
+    job_id = _start_processing_job(upload_path, settings, file_id=file_id)
+    with jobs_lock:
+        job = processing_jobs.get(job_id)
+        if job is not None:
+            job['filename'] = upload_info.get('filename')
+            job['method'] = settings.get('extraction_method') or settings.get('method') or 'default'
 
     return jsonify({
         'success': True,
@@ -371,8 +702,10 @@ def api_process():
 
 @app.route('/api/job/<job_id>/logs')
 def api_job_logs(job_id: str):
-    job = processing_jobs.get(job_id)
-    if not job:
+    with jobs_lock:
+        job = processing_jobs.get(job_id)
+        logs = list(job.get('logs', ())) if job else None
+    if logs is None:
         return jsonify({'success': False, 'message': 'job not found'}), 404
     try:
         n = int(request.args.get('n', 50))
@@ -380,7 +713,6 @@ def api_job_logs(job_id: str):
         n = 50
     include_host = request.args.get('host') in ('1', 'true', 'yes')
 
-    logs = job.get('logs', [])
     if n > 0:
         logs = logs[-n:]
 
@@ -393,31 +725,113 @@ def api_job_logs(job_id: str):
         except Exception:
             logging.exception('Failed to read host log file')
 
-    return jsonify({
+    return _json_response({
         'success': True,
         'logs': logs,
         'host_log_lines': host_lines,
     })
 
 
+@app.route('/api/job/<job_id>/stream')
+def api_job_stream(job_id: str):
+    """Server-Sent Events feed of a job: each new log line as a message, plus a
+    `progress` event carrying status and percent. The worker pushes updates, so
+    clients don't need to poll /api/progress (which stays available as a fallback).
+    The stream ends with an `end` event once the job reaches a final status or
+    its worker has finished (a processor may return without a `complete` event),
+    and is closed without one after JOB_STREAM_MAX_LIFETIME seconds.
+    """
+    with jobs_lock:
+        job = processing_jobs.get(job_id)
+        done_event = job_done_events.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'job not found'}), 404
+
+    def finished():
+        return job.get('status') in FINAL_JOB_STATUSES or (done_event is not None and done_event.is_set())
+
+    def generate():
+        last_seq = 0
+        last_progress = None
+        deadline = time.monotonic() + JOB_STREAM_MAX_LIFETIME
+        while True:
+            with job_updates:
+                job_updates.wait_for(
+                    lambda: job.get('log_seq', 0) > last_seq
+                    or (job.get('status'), job.get('percent_complete')) != last_progress
+                    or finished(),
+                    timeout=max(0, min(JOB_STREAM_KEEPALIVE, deadline - time.monotonic())),
+                )
+                done = finished()
+                with jobs_lock:
+                    logs = list(job.get('logs', ()))
+                    progress = (job.get('status'), job.get('percent_complete'))
+                new_logs = [e for e in logs if e.get('seq', 0) > last_seq]
+            sent = False
+            for entry in new_logs:
+                last_seq = entry['seq']
+                # Multi-line messages need a data: prefix on every line
+                lines = str(entry['message']).splitlines() or ['']
+                yield ''.join(f"data: {line}\n" for line in lines) + "\n"
+                sent = True
+            if progress != last_progress:
+                last_progress = progress
+                payload = json.dumps({'status': progress[0], 'percent_complete': progress[1]})
+                yield f"event: progress\ndata: {payload}\n\n"
+                sent = True
+            if done:
+                yield f"event: end\ndata: {progress[0]}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                return
+            if not sent:
+                yield ': keep-alive\n\n'
+
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/api/job/<job_id>/cancel', methods=['POST'])
 def api_job_cancel(job_id: str):
-    job = processing_jobs.get(job_id)
-    if not job:
+    with jobs_lock:
+        job = processing_jobs.get(job_id)
+        if job is not None:
+            job['cancel_requested'] = True
+            job['status'] = 'cancelling'
+    if job is None:
         return jsonify({'success': False, 'message': 'job not found'}), 404
-    job['cancel_requested'] = True
-    job['status'] = 'cancelling'
+    with job_updates:
+        job_updates.notify_all()
     return jsonify({'success': True, 'message': 'Cancellation requested'})
 
 
 @app.route('/api/progress/<job_id>')
 def api_progress(job_id: str):
-    job = processing_jobs.get(job_id)
-    if not job:
+    with jobs_lock:
+        job = processing_jobs.get(job_id)
+        snapshot = _job_snapshot(job) if job else None
+    if snapshot is None:
         return jsonify({"success": False, "message": "job not found"}), 404
-    return jsonify({"success": True, "job": job})
+    return _json_response({"success": True, "job": snapshot})
 
 
+def _job_snapshot(job: dict) -> dict:
+    """Return a JSON-serialisable copy of a job, with its log/extract deques as lists.
+
+    Call with `jobs_lock` held.
+    """
+    return {**job, "logs": list(job.get("logs", ())), "extracts": list(job.get("extracts", ()))}
+
+
+def _percent_of(done, total):
+    """Return `done` as a percentage of `total`, capped at 100.
+
+    None when either value is missing or not a number (or `total` is zero), so
+    progress events never need a try/except around the division.
+    """
+    if not isinstance(done, numbers.Real) or not isinstance(total, numbers.Real) or not total:
+        return None
+    return min(100.0, done / total * 100.0)
+
 
 def _clear_directory_contents(directory, keep_names=None):
     """Remove all files and subdirectories inside `directory`, excluding names in `keep_names`.
@@ -429,37 +843,39 @@ def _clear_directory_contents(directory, keep_names=None):
         return
     keep = set(keep_names or [])
     try:
-        for entry in os.listdir(directory):
-            if entry in keep:
-                continue
-            path = os.path.join(directory, entry)
-            try:
-                if os.path.isdir(path) and not os.path.islink(path):
-                    shutil.rmtree(path)
-                    logging.info("Removed directory from uploads: %s", path)
-                else:
-                    os.remove(path)
-                    logging.info("Removed file from uploads: %s", path)
-            except Exception:
-                logging.exception("Failed to remove %s", path)
+        # scandir entries carry their file type from readdir, so no extra stat per entry
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if entry.name not in keep]
+    except FileNotFoundError:
+        return
     except Exception:
         logging.exception("Failed to list directory for cleanup: %s", directory)
+        return
 
-
-# Optionally clear uploads directory on server start to avoid filling disk.
-# Controlled by environment variable `VID2DOC_CLEAR_UPLOADS_ON_START` (default: true).
-# Also skip when running under pytest (PYTEST_CURRENT_TEST is set by pytest) to avoid
-# interfering with test fixtures.
-try:
-    clear_on_start = os.environ.get('VID2DOC_CLEAR_UPLOADS_ON_START', 'true').lower() in ('1', 'true', 'yes')
-except Exception:
-    clear_on_start = True
-
-if clear_on_start and 'PYTEST_CURRENT_TEST' not in os.environ:
-    try:
-        _clear_directory_contents(app.config['UPLOAD_FOLDER'], keep_names={'.gitkeep', 'README.md'})
-    except Exception:
-        logging.exception('Failed to clear uploads directory on startup')
+    removed_files = 0
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            else:
+                os.unlink(entry.path)
+                removed_files += 1
+        except Exception:
+            logging.exception("Failed to remove %s", entry.path)
+
+    removed_dirs = 0
+    if subdirs:
+        # Tree removal is bound by unlink latency, so leftover job directories are removed concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as pool:
+            futures = {pool.submit(shutil.rmtree, path): path for path in subdirs}
+        for future, path in futures.items():
+            if future.exception() is not None:
+                logging.error("Failed to remove %s", path, exc_info=future.exception())
+            else:
+                removed_dirs += 1
+    if removed_files or removed_dirs:
+        logging.info("Cleared %s: removed %d file(s) and %d directory(ies)", directory, removed_files, removed_dirs)
 
 
 @app.route('/system')
@@ -474,66 +890,71 @@ def system_settings():
 def export_slides_csv():
     """Export all slides with their details to CSV for backup."""
     try:
-        # Get all slides with related data
-        slides = get_all_slides_for_export()
-        
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'Slide ID',
-            'Video Filename', 
-            'Frame Number',
-            'Timestamp (seconds)',
-            'Order Index',
-            'Section Title',
-            'Create New Page',
-            'Final Text',
-            'Is Locked',
-            'Image Path'
-        ])
-        
-        # Write data rows
-        for slide in slides:
-            # Use final_text if available, otherwise suggested_text, otherwise original_text
-            text_content = slide['final_text']
-            if not text_content:
-                text_content = slide['suggested_text']
-            if not text_content:
-                text_content = slide['original_text']
-            text_content = text_content or ''
-            
-            writer.writerow([
-                slide['id'],
-                slide['video_filename'],
-                slide['frame_number'],
-                slide['timestamp'],
-                slide['order_index'] or '',
-                slide['section_title'] or '',
-                'Yes' if slide['create_new_page'] else 'No',
-                text_content,
-                'Yes' if slide['is_locked'] else 'No',
-                slide['image_path']
-            ])
-        
-        # Create response
-        output.seek(0)
-        response = Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': 'attachment; filename=slides_backup.csv'
-            }
-        )
-        return response
-        
+        # Get all slides with related data; rows are read as the response is sent
+        slides = iter_slides_for_export()
     except Exception as e:
         logging.exception('Failed to export slides to CSV')
         flash(f'Error exporting slides: {str(e)}', 'error')
         return redirect(url_for('system_settings'))
 
+    def generate():
+        # One reusable buffer: write a batch of rows, hand its text out, reset
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        def flush():
+            chunk = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return chunk
+
+        try:
+            # Write header
+            writer.writerow([
+                'Slide ID',
+                'Video Filename', 
+                'Frame Number',
+                'Timestamp (seconds)',
+                'Order Index',
+                'Section Title',
+                'Create New Page',
+                'Final Text',
+                'Is Locked',
+                'Image Path'
+            ])
+            yield flush()
+
+            # Write data rows
+            rows = (
+                (
+                    slide['id'],
+                    slide['video_filename'],
+                    slide['frame_number'],
+                    slide['timestamp'],
+                    slide['order_index'] or '',
+                    slide['section_title'] or '',
+                    'Yes' if slide['create_new_page'] else 'No',
+                    slide['text_content'],
+                    'Yes' if slide['is_locked'] else 'No',
+                    slide['image_path'],
+                )
+                for slide in slides
+            )
+            while batch := list(islice(rows, CSV_EXPORT_BATCH)):
+                writer.writerows(batch)
+                yield flush()
+        finally:
+            # Hand the read connection back even if the client disconnects mid-download
+            slides.close()
+
+    return Response(
+        generate(),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': 'attachment; filename=slides_backup.csv'
+        }
+    )
+
 # --- rest of the original app.py routes and helpers ---
 # To keep the packaged app in sync, the remaining route handlers are copied
 # verbatim from the original root `app.py`. For brevity this file contains the
@@ -541,37 +962,66 @@ def export_slides_csv():
 # updated to reference `vid2doc.*` modules where appropriate.
 
 def _list_wav_files():
-    files = []
-    for fn in os.listdir('wav'):
-        if fn.lower().endswith('.wav'):
-            files.append(os.path.join('wav', fn))
-    return files
+    # DirEntry.is_file() uses the type readdir already returned, so no stat per file
+    with os.scandir('wav') as entries:
+        return [os.path.join('wav', e.name) for e in entries if e.name.lower().endswith('.wav') and e.is_file()]
+
+
+# Runs of filename characters; a wav name made only of these lies inside one run
+_WAV_NAME_RUN_RE = re.compile(r'[\w.-]+')
+
+
+def _referenced_wavs(paths, texts):
+    """Return the subset of `paths` whose file name appears anywhere in `texts`.
+
+    Equivalent to testing `basename in text` for every pair, but each text is
+    scanned once: names made of word characters, dots and dashes are looked up
+    by every substring that ends at a ".wav" inside a run of such characters.
+    Any other names (e.g. with spaces or an upper-case ".WAV") fall back to the
+    plain substring test.
+    """
+    by_name = {}
+    for path in paths:
+        by_name.setdefault(os.path.basename(path), []).append(path)
+    unusual = [name for name in by_name if not (name.endswith('.wav') and _WAV_NAME_RUN_RE.fullmatch(name))]
+
+    found = set()
+    for text in texts:
+        if not text:
+            continue
+        for run in _WAV_NAME_RUN_RE.findall(text):
+            end = run.find('.wav')
+            while end != -1:
+                end += 4
+                for start in range(end - 3):
+                    if run[start:end] in by_name:
+                        found.add(run[start:end])
+                end = run.find('.wav', end - 3)
+        found.update(name for name in unusual if name in text)
+    return {path for name in found for path in by_name[name]}
+
+
+def _compute_orphan_wavs():
+    """Return the sorted paths of wav files not referenced by any text extract."""
+    existing = set(_list_wav_files())
+    # Find wavs referenced in DB by filename
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    # Every listed name ends in .wav (any case), and LIKE is case-insensitive
+    cursor.execute("SELECT DISTINCT original_text FROM text_extracts WHERE original_text LIKE '%.wav%'")
+    texts = [r['original_text'] for r in cursor.fetchall()]
+    conn.close()
+
+    # Naive heuristic: if filename appears in any stored text, consider it referenced.
+    referenced = _referenced_wavs(existing, texts)
+    return sorted(existing - referenced)
 
 
 @app.route('/api/list_orphan_wavs')
 def api_list_orphan_wavs():
     """Return list of wav files that are not referenced in the DB."""
     try:
-        existing = set(_list_wav_files())
-        # Find wavs referenced in DB by filename
-        from vid2doc.database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT DISTINCT original_text FROM text_extracts')
-        texts = [r['original_text'] for r in cursor.fetchall()]
-        conn.close()
-
-        # Naive heuristic: if filename appears in any stored text or in output paths, consider it referenced.
-        referenced = set()
-        for t in texts:
-            if not t:
-                continue
-            for f in existing:
-                if os.path.basename(f) in t:
-                    referenced.add(f)
-
-        orphans = sorted(list(existing - referenced))
-        return jsonify({'success': True, 'files': orphans})
+        return _json_response({'success': True, 'files': _compute_orphan_wavs()})
     except Exception as e:
         logging.exception('Failed to list orphan wavs')
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -581,10 +1031,11 @@ def api_list_orphan_wavs():
 def api_clear_orphan_wavs():
     """Delete orphan wav files determined by the same heuristic as listing."""
     try:
-        listed = api_list_orphan_wavs().get_json()
-        if not listed.get('success'):
+        try:
+            files = _compute_orphan_wavs()
+        except Exception:
+            logging.exception('Failed to list orphan wavs')
             return jsonify({'success': False, 'message': 'Failed to compute orphan list'}), 500
-        files = listed.get('files', [])
         deleted = []
         for f in files:
             try:
@@ -619,11 +1070,8 @@ def api_reset_db():
     if not data.get('confirm'):
         return jsonify({'success': False, 'message': 'Confirmation required'}), 400
     try:
-        # Remove database file and re-run init
-        db_path = os.path.abspath('video_documentation.db')
-        if os.path.exists(db_path):
-            os.remove(db_path)
-        init_db()
+        reset_db()
+        _invalidate_nav_cache()
         return jsonify({'success': True, 'message': 'Database reset and reinitialized'})
     except Exception as e:
         logging.exception('Failed to reset DB')
@@ -668,12 +1116,38 @@ def admin_purge_audio_failures():
 
 
 
+# get_latest_video_with_slides() result shared by page renders. It only changes when
+# a processing job finishes or the database is reset, which bump "gen"; the value is
+# reused while "computed_gen" and the database path still match.
+_nav_cache = {"gen": 0, "computed_gen": -1, "path": None, "value": None}
+_nav_cache_lock = threading.Lock()
+
+
+def _invalidate_nav_cache():
+    with _nav_cache_lock:
+        _nav_cache["gen"] += 1
+
+
+def _latest_video_with_slides_cached():
+    path = db_module.DATABASE_PATH
+    with _nav_cache_lock:
+        gen = _nav_cache["gen"]
+        if _nav_cache["computed_gen"] == gen and _nav_cache["path"] == path:
+            return _nav_cache["value"]
+    value = get_latest_video_with_slides()
+    with _nav_cache_lock:
+        # Not stored if a job finished while querying; the next render retries
+        if _nav_cache["gen"] == gen:
+            _nav_cache.update(computed_gen=gen, path=path, value=value)
+    return value
+
+
 def _resolve_nav_edit_url(preferred_video_id=None):
     """Determine the navigation URL for editing slides."""
     if preferred_video_id:
         return url_for('edit_video', video_id=preferred_video_id)
 
-    latest_video_id = get_latest_video_with_slides()
+    latest_video_id = _latest_video_with_slides_cached()
     if latest_video_id:
         return url_for('edit_video', video_id=latest_video_id)
 
@@ -731,12 +1205,7 @@ def edit_video(video_id):
     )
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
-
-
-def create_app():
-    """Return the Flask application instance defined in this module."""
-    return app
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
 
 
 __all__ = ['app', 'create_app']
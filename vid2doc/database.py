@@ -1,6 +1,9 @@
 """Database module for managing video documentation data"""
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 
@@ -12,12 +15,186 @@ DATABASE_PATH = 'video_documentation.db'
 # - 'first': use earliest text_extract by created_at,id
 TEXT_EXTRACT_SELECTION = os.getenv('TEXT_EXTRACT_SELECTION', 'latest')
 
+# Seconds a connection waits on a locked database before raising SQLITE_BUSY
+BUSY_TIMEOUT = 30
+# Idle connections kept open per database file
+POOL_SIZE = 5
+# Database files already switched to WAL, keyed like _PooledConnection.pool_key;
+# the journal mode persists in the file itself
+_WAL_PATHS = set()
+# Serialises writers in-process (request handlers and the processing worker) so they
+# queue here instead of each holding a connection while SQLite makes them wait.
+# Re-entrant because a write helper called without `conn` inside bulk_context() takes it
+# again; _BULK hands that helper the open bulk connection instead of a second one, which
+# would otherwise wait on SQLite's lock held by the first.
+_WRITE_LOCK = threading.RLock()
+# Per-thread connection of the innermost active bulk_context(), if any
+_BULK = threading.local()
+# DATABASE_PATH -> LifoQueue of idle _PooledConnection objects
+_POOLS = {}
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to the idle pool for its file."""
+
+    pool_key = None
+    idle = False
+
+    def close(self):
+        if self.idle:
+            return
+        try:
+            if self.in_transaction:
+                self.rollback()
+            self.row_factory = sqlite3.Row
+            self.idle = True
+            _POOLS.setdefault(self.pool_key[0], queue.LifoQueue(maxsize=POOL_SIZE)).put_nowait(self)
+        except (queue.Full, sqlite3.Error):
+            self.idle = False
+            self.discard()
+
+    def discard(self):
+        """Really close the underlying connection."""
+        self.idle = False
+        super().close()
+
+
+def _file_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _take_pooled(path):
+    """Return an idle connection to the file currently at `path`, or None."""
+    pool = _POOLS.get(path)
+    if pool is None:
+        return None
+    key = (path, _file_identity(path))
+    while True:
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            return None
+        # The file may have been deleted and recreated since this connection was opened
+        if conn.pool_key == key:
+            conn.idle = False
+            return conn
+        conn.discard()
+
+
+def close_idle_connections(path=None):
+    """Close pooled idle connections for `path` (default: all databases)."""
+    for pool_path in [path] if path is not None else list(_POOLS):
+        pool = _POOLS.pop(pool_path, None)
+        while pool is not None and not pool.empty():
+            pool.get_nowait().discard()
+
+
 def get_db_connection():
-    """Create a database connection"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Return a database connection, reusing an idle pooled one when possible.
+
+    Calling close() returns it to the pool (rolling back anything uncommitted).
+    DATABASE_PATH may also be a `file:` URI, e.g. a shared-cache in-memory
+    database for tests; pooled connections keep that database alive.
+    """
+    uri = DATABASE_PATH.startswith('file:')
+    if os.environ.get('VID2DOC_TEST_FAST') == '1' or DATABASE_PATH == ':memory:':
+        # EXCLUSIVE locking holds the file lock until close, and every :memory:
+        # connection is its own database, so neither is pooled
+        conn = sqlite3.connect(DATABASE_PATH, timeout=BUSY_TIMEOUT, uri=uri)
+        conn.row_factory = sqlite3.Row
+        if DATABASE_PATH != ':memory:':
+            _apply_fast_test_pragmas(conn)
+        return conn
+    conn = _take_pooled(DATABASE_PATH)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, timeout=BUSY_TIMEOUT, check_same_thread=False, factory=_PooledConnection, uri=uri)
+        conn.row_factory = sqlite3.Row
+        conn.pool_key = (DATABASE_PATH, _file_identity(DATABASE_PATH))
+        _apply_wal_pragmas(conn)
     return conn
 
+
+def _apply_wal_pragmas(conn):
+    """Let readers proceed while a writer commits (e.g. progress polling during processing)."""
+    if conn.pool_key not in _WAL_PATHS:
+        conn.execute('PRAGMA journal_mode=WAL')
+        _WAL_PATHS.add(conn.pool_key)
+    # synchronous is per connection; NORMAL is safe under WAL
+    conn.execute('PRAGMA synchronous=NORMAL')
+    # Pooled connections live long enough for a bigger page cache (16 MiB each,
+    # default is 2 MiB) to pay off; sorts and temp indexes stay in memory
+    conn.execute('PRAGMA cache_size=-16384')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+
+def _apply_fast_test_pragmas(conn):
+    """Trade durability for speed on throwaway test databases.
+
+    Only applied when VID2DOC_TEST_FAST=1; never enable this for real data.
+    """
+    conn.execute('PRAGMA journal_mode=MEMORY')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA locking_mode=EXCLUSIVE')
+
+
+@contextmanager
+def bulk_context():
+    """Group several writes into a single transaction.
+
+    Yields a connection that write helpers accept via their `conn` argument;
+    helpers called without it on the same thread join the transaction too.
+    Everything is committed once on exit (or rolled back on error); a nested
+    bulk_context() simply reuses the outer transaction.
+    """
+    active = getattr(_BULK, 'conn', None)
+    if active is not None:
+        yield active
+        return
+    with _WRITE_LOCK:
+        conn = get_db_connection()
+        _BULK.conn = conn
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            _BULK.conn = None
+            conn.close()
+
+
+@contextmanager
+def _write_connection(conn=None):
+    """Yield `conn` as-is, or a fresh connection that is committed and closed on exit.
+
+    Without `conn`, the thread's active bulk_context() connection is used if
+    there is one, so the write lands in that transaction. A fresh connection is only opened once the write lock is held, and its
+    transaction starts with BEGIN IMMEDIATE so SQLite's write lock is taken up
+    front rather than upgraded from a read lock mid-transaction.
+    """
+    if conn is None:
+        conn = getattr(_BULK, 'conn', None)
+    if conn is not None:
+        yield conn
+        return
+    with _WRITE_LOCK:
+        conn = get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
 def init_db():
     """Initialize the database with required tables"""
     conn = get_db_connection()
@@ -148,34 +325,57 @@ def init_db():
     except Exception:
         logging.exception('Failed to run audio_failures table migration (ignored)')
 
+    # Indexes backing newest-first lookups; names match the SQLAlchemy models
+    try:
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_videos_upload_date ON videos (upload_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_sections_created_at ON sections (created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_text_extracts_created_at ON text_extracts (created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_text_extracts_updated_at ON text_extracts (updated_at)")
+        conn.commit()
+    except Exception:
+        logging.exception('Failed to create timestamp indexes (ignored)')
+
     conn.close()
     logging.info("Database initialized successfully")
 
-def add_video(filename, original_path, duration=None, fps=None):
+def reset_db():
+    """Delete the database file and recreate an empty schema.
+
+    Idle pooled connections are closed first and the WAL/shared-memory files
+    are removed with the database, so a stale -wal can't be replayed into the
+    new file. Holds the write lock so no in-process writer is mid-transaction.
+    """
+    with _WRITE_LOCK:
+        close_idle_connections(DATABASE_PATH)
+        _WAL_PATHS.difference_update({key for key in _WAL_PATHS if key[0] == DATABASE_PATH})
+        if DATABASE_PATH != ':memory:' and not DATABASE_PATH.startswith('file:'):
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(DATABASE_PATH + suffix)
+                except FileNotFoundError:
+                    pass
+        init_db()
+
+
+def add_video(filename, original_path, duration=None, fps=None, conn=None):
     """Add a new video to the database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO videos (filename, original_path, duration, fps)
-        VALUES (?, ?, ?, ?)
-    ''', (filename, original_path, duration, fps))
-    video_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return video_id
+    with _write_connection(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO videos (filename, original_path, duration, fps)
+            VALUES (?, ?, ?, ?)
+        ''', (filename, original_path, duration, fps))
+        return cursor.lastrowid
 
-def add_slide(video_id, frame_number, timestamp, image_path):
+def add_slide(video_id, frame_number, timestamp, image_path, conn=None):
     """Add a slide/frame to the database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO slides (video_id, frame_number, timestamp, image_path, order_index)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (video_id, frame_number, timestamp, image_path, frame_number))
-    slide_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return slide_id
+    with _write_connection(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO slides (video_id, frame_number, timestamp, image_path, order_index)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (video_id, frame_number, timestamp, image_path, frame_number))
+        return cursor.lastrowid
 
 def add_slide_minimal(video_id, image_path=None):
     """Insert a minimal slide for testing. If image_path not provided, use a placeholder.
@@ -213,28 +413,23 @@ def get_slide_by_id(slide_id):
 
 def add_text_extract(slide_id, original_text, suggested_text=None):
     """Add text extract for a slide"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO text_extracts (slide_id, original_text, suggested_text)
-        VALUES (?, ?, ?)
-    ''', (slide_id, original_text, suggested_text))
-    extract_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return extract_id
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO text_extracts (slide_id, original_text, suggested_text)
+            VALUES (?, ?, ?)
+        ''', (slide_id, original_text, suggested_text))
+        return cursor.lastrowid
 
 def update_text_extract(extract_id, final_text, is_locked=False):
     """Update the final text and lock status"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE text_extracts 
-        SET final_text = ?, is_locked = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-    ''', (final_text, is_locked, extract_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE text_extracts 
+            SET final_text = ?, is_locked = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (final_text, is_locked, extract_id))
 
 def get_video_slides(video_id):
     """Get all slides for a video"""
@@ -313,20 +508,33 @@ def get_text_extract_by_slide(slide_id):
     return row
 
 
-def set_final_text_for_slide(slide_id, new_text, is_locked=False):
+def set_final_text_for_slide(slide_id, new_text, is_locked=False, conn=None):
     """Set (or create) the final_text and lock status for the most recent extract of a slide."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    # Try to find an existing extract
-    cursor.execute('SELECT id FROM text_extracts WHERE slide_id = ? ORDER BY created_at DESC, id DESC LIMIT 1', (slide_id,))
-    r = cursor.fetchone()
-    if r:
-        extract_id = r['id']
-        cursor.execute('UPDATE text_extracts SET final_text = ?, is_locked = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (new_text, int(bool(is_locked)), extract_id))
-    else:
-        cursor.execute('INSERT INTO text_extracts (slide_id, original_text, final_text, is_locked) VALUES (?, ?, ?, ?)', (slide_id, '', new_text, int(bool(is_locked))))
-    conn.commit()
-    conn.close()
+    with _write_connection(conn) as conn:
+        cursor = conn.cursor()
+        # Try to find an existing extract
+        cursor.execute('SELECT id FROM text_extracts WHERE slide_id = ? ORDER BY created_at DESC, id DESC LIMIT 1', (slide_id,))
+        r = cursor.fetchone()
+        if r:
+            extract_id = r['id']
+            cursor.execute('UPDATE text_extracts SET final_text = ?, is_locked = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (new_text, int(bool(is_locked)), extract_id))
+        else:
+            cursor.execute('INSERT INTO text_extracts (slide_id, original_text, final_text, is_locked) VALUES (?, ?, ?, ?)', (slide_id, '', new_text, int(bool(is_locked))))
+
+
+def set_final_texts_for_slides(updates, is_locked=False, conn=None):
+    """Apply set_final_text_for_slide for each (slide_id, text) pair, in order, in one transaction.
+
+    Returns how many updates were applied.
+    """
+    updates = list(updates)
+    if not updates:
+        return 0
+    with _write_connection(conn) as conn:
+        for slide_id, new_text in updates:
+            set_final_text_for_slide(slide_id, new_text, is_locked=is_locked, conn=conn)
+    return len(updates)
+
 
 def merge_from_slide_into_target(source_slide_id, target_slide_id, append=True):
     """
@@ -335,16 +543,14 @@ def merge_from_slide_into_target(source_slide_id, target_slide_id, append=True):
     After merge, source slide and its extracts are deleted.
     Returns dict with target_slide and deleted source info.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+    with _write_connection() as conn:
+        cursor = conn.cursor()
         # Fetch source and target slides
         cursor.execute('SELECT * FROM slides WHERE id = ? LIMIT 1', (source_slide_id,))
         src = cursor.fetchone()
         cursor.execute('SELECT * FROM slides WHERE id = ? LIMIT 1', (target_slide_id,))
         tgt = cursor.fetchone()
         if not src or not tgt:
-            conn.close()
             return None
 
         # Get latest extracts
@@ -374,80 +580,58 @@ def merge_from_slide_into_target(source_slide_id, target_slide_id, append=True):
         cursor.execute('DELETE FROM text_extracts WHERE slide_id = ?', (source_slide_id,))
         cursor.execute('DELETE FROM slides WHERE id = ?', (source_slide_id,))
 
-        conn.commit()
         return {
             'target_slide_id': target_slide_id,
             'merged_text': merged,
             'deleted_source_id': source_slide_id,
             'deleted_source_image': src_image_path,
         }
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
 
 
 def update_text_extract_original_suggested(extract_id, original_text, suggested_text=None):
     """Update the original_text and suggested_text fields for an extract."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE text_extracts
-        SET original_text = ?, suggested_text = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-    ''', (original_text, suggested_text, extract_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        conn.execute('''
+            UPDATE text_extracts
+            SET original_text = ?, suggested_text = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (original_text, suggested_text, extract_id))
 
 def create_section(video_id, title, order_index, create_new_page=False):
     """Create a new section/chapter. create_new_page indicates whether the PDF should start the section on a new page."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO sections (video_id, title, order_index, create_new_page)
-        VALUES (?, ?, ?, ?)
-    ''', (video_id, title, order_index, int(bool(create_new_page))))
-    section_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return section_id
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO sections (video_id, title, order_index, create_new_page)
+            VALUES (?, ?, ?, ?)
+        ''', (video_id, title, order_index, int(bool(create_new_page))))
+        return cursor.lastrowid
 
 def delete_section(section_id):
     """Delete a section and unassign all slides from it."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+    with _write_connection() as conn:
+        cursor = conn.cursor()
         # First, unassign all slides from this section
         cursor.execute('UPDATE slides SET section_id = NULL WHERE section_id = ?', (section_id,))
-        
+
         # Then delete the section
         cursor.execute('DELETE FROM sections WHERE id = ?', (section_id,))
-        
-        conn.commit()
+
         return cursor.rowcount > 0  # Return True if section was deleted
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
 
 def assign_slide_to_section(slide_id, section_id):
     """Assign a slide to a section"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE slides SET section_id = ? WHERE id = ?
-    ''', (section_id, slide_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE slides SET section_id = ? WHERE id = ?
+        ''', (section_id, slide_id))
 
 
 def delete_slide(slide_id):
     """Delete a slide and its associated text_extracts and optionally image file path reference."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+    with _write_connection() as conn:
+        cursor = conn.cursor()
         # Fetch slide row
         cursor.execute('SELECT * FROM slides WHERE id = ? LIMIT 1', (slide_id,))
         slide_row = cursor.fetchone()
@@ -462,9 +646,6 @@ def delete_slide(slide_id):
         extracts_deleted = cursor.rowcount
         cursor.execute('DELETE FROM slides WHERE id = ?', (slide_id,))
         slides_deleted = cursor.rowcount
-        conn.commit()
-    finally:
-        conn.close()
 
     # Return the slide and extracts so callers can offer an undo/backup
     image_path = slide.get('image_path') if slide else None
@@ -543,9 +724,8 @@ def delete_video(video_id):
     can perform best-effort filesystem cleanup (images, wavs).
     Returns dict with keys: video (row or None), slides (list of slide rows), image_paths (list)
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+    with _write_connection() as conn:
+        cursor = conn.cursor()
         # Get video row
         cursor.execute('SELECT * FROM videos WHERE id = ? LIMIT 1', (video_id,))
         video_row = cursor.fetchone()
@@ -583,8 +763,6 @@ def delete_video(video_id):
         cursor.execute('DELETE FROM videos WHERE id = ?', (video_id,))
         videos_deleted = cursor.rowcount
 
-        conn.commit()
-
         return {
             'video': video,
             'slides': slides,
@@ -597,24 +775,16 @@ def delete_video(video_id):
                 'audio_failures_deleted': af_deleted,
             }
         }
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
 
 
 def update_video_document(video_id, title: str | None, summary: str | None):
     """Update document title and summary for a video."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE videos
-        SET document_title = ?, document_summary = ?
-        WHERE id = ?
-    ''', (title, summary, video_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        conn.execute('''
+            UPDATE videos
+            SET document_title = ?, document_summary = ?
+            WHERE id = ?
+        ''', (title, summary, video_id))
 
 def get_video_by_id(video_id):
     """Fetch a single video record."""
@@ -634,16 +804,33 @@ def add_audio_failure(video_id, slide_id, start_frame, end_frame, attempts, erro
       - stderr: raw STDERR or error message
       - details: any additional debugging details
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO audio_failures (video_id, slide_id, start_frame, end_frame, attempts, error_message, tool, stderr, details)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (video_id, slide_id, start_frame, end_frame, attempts, error_message, tool, stderr, details))
-    failure_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return failure_id
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO audio_failures (video_id, slide_id, start_frame, end_frame, attempts, error_message, tool, stderr, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (video_id, slide_id, start_frame, end_frame, attempts, error_message, tool, stderr, details))
+        return cursor.lastrowid
+
+
+_AUDIO_FAILURE_COLUMNS = ('video_id', 'slide_id', 'start_frame', 'end_frame', 'attempts', 'error_message', 'tool', 'stderr', 'details')
+
+
+def add_audio_failures_bulk(failures, conn=None):
+    """Record several audio failures in one transaction and return how many were added.
+
+    Each item is a dict keyed like add_audio_failure's parameters; missing keys
+    are stored as NULL.
+    """
+    rows = [tuple(f.get(col) for col in _AUDIO_FAILURE_COLUMNS) for f in failures]
+    if not rows:
+        return 0
+    with _write_connection(conn) as conn:
+        conn.executemany(f'''
+            INSERT INTO audio_failures ({', '.join(_AUDIO_FAILURE_COLUMNS)})
+            VALUES ({', '.join('?' * len(_AUDIO_FAILURE_COLUMNS))})
+        ''', rows)
+    return len(rows)
 
 
 def get_audio_failures(limit: int = 100, video_id: int = None):
@@ -676,9 +863,8 @@ def restore_slide(slide_row: dict, extracts: list[dict]):
     """Restore a slide row and its extracts. slide_row is a dict containing slide fields."""
     if not slide_row:
         return None
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+    with _write_connection() as conn:
+        cursor = conn.cursor()
         # Insert slide (preserve id if possible via explicit id insert)
         # SQLite supports explicit id insertion if it doesn't conflict.
         cols = [k for k in slide_row.keys() if k != 'id']
@@ -700,10 +886,6 @@ def restore_slide(slide_row: dict, extracts: list[dict]):
                 cursor.execute('INSERT INTO text_extracts (id, ' + ','.join(cols_ex) + ') VALUES (' + ','.join('?' for _ in (['id']+cols_ex)) + ')', [ex['id']] + values_ex)
             except Exception:
                 cursor.execute('INSERT INTO text_extracts (' + ','.join(cols_ex) + ') VALUES (' + placeholders_ex + ')', values_ex)
-
-        conn.commit()
-    finally:
-        conn.close()
     return slide_row
 
 def get_latest_video_with_slides():
@@ -735,106 +917,92 @@ def get_latest_video_with_slides():
 
 def mark_video_processed(video_id):
     """Mark a video as processed"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE videos SET processed = 1 WHERE id = ?
-    ''', (video_id,))
-    conn.commit()
-    conn.close()
-
-
-def update_video_document(video_id, title, summary):
-    """Update document title and summary for a video."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE videos
-        SET document_title = ?, document_summary = ?
-        WHERE id = ?
-    ''', (title, summary, video_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        conn.execute('''
+            UPDATE videos SET processed = 1 WHERE id = ?
+        ''', (video_id,))
 
 
 def reorder_slide(slide_id, direction):
     """Move a slide up or down in the ordering sequence"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get current slide info
-    cursor.execute('SELECT video_id, order_index FROM slides WHERE id = ?', (slide_id,))
-    slide = cursor.fetchone()
-    if not slide:
-        conn.close()
-        return False
-    
-    video_id, current_order = slide
-    
-    # Get all slides for this video ordered by current order
-    cursor.execute('''
-        SELECT id, order_index FROM slides 
-        WHERE video_id = ? 
-        ORDER BY COALESCE(order_index, frame_number), frame_number
-    ''', (video_id,))
-    slides = cursor.fetchall()
-    
-    # Find current position
-    current_pos = None
-    for i, (sid, order) in enumerate(slides):
-        if sid == slide_id:
-            current_pos = i
-            break
-    
-    if current_pos is None:
-        conn.close()
-        return False
-    
-    # Calculate new position
-    if direction == 'up' and current_pos > 0:
-        new_pos = current_pos - 1
-    elif direction == 'down' and current_pos < len(slides) - 1:
-        new_pos = current_pos + 1
-    else:
-        conn.close()
-        return False  # Can't move further
-    
-    # Swap order_index with the target slide
-    target_slide_id = slides[new_pos][0]
-    
-    # Get current order_index values
-    cursor.execute('SELECT order_index FROM slides WHERE id = ?', (slide_id,))
-    current_order = cursor.fetchone()[0]
-    cursor.execute('SELECT order_index FROM slides WHERE id = ?', (target_slide_id,))
-    target_order = cursor.fetchone()[0]
-    
-    # Swap the order_index values
-    cursor.execute('UPDATE slides SET order_index = ? WHERE id = ?', (target_order, slide_id))
-    cursor.execute('UPDATE slides SET order_index = ? WHERE id = ?', (current_order, target_slide_id))
-    
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+
+        # Get current slide info
+        cursor.execute('SELECT video_id, order_index FROM slides WHERE id = ?', (slide_id,))
+        slide = cursor.fetchone()
+        if not slide:
+            return False
+
+        video_id, current_order = slide
+
+        # Get all slides for this video ordered by current order
+        cursor.execute('''
+            SELECT id, order_index FROM slides 
+            WHERE video_id = ? 
+            ORDER BY COALESCE(order_index, frame_number), frame_number
+        ''', (video_id,))
+        slides = cursor.fetchall()
+
+        # Find current position
+        current_pos = None
+        for i, (sid, order) in enumerate(slides):
+            if sid == slide_id:
+                current_pos = i
+                break
+
+        if current_pos is None:
+            return False
+
+        # Calculate new position
+        if direction == 'up' and current_pos > 0:
+            new_pos = current_pos - 1
+        elif direction == 'down' and current_pos < len(slides) - 1:
+            new_pos = current_pos + 1
+        else:
+            return False  # Can't move further
+
+        # Swap order_index with the target slide
+        target_slide_id = slides[new_pos][0]
+
+        # Get current order_index values
+        cursor.execute('SELECT order_index FROM slides WHERE id = ?', (slide_id,))
+        current_order = cursor.fetchone()[0]
+        cursor.execute('SELECT order_index FROM slides WHERE id = ?', (target_slide_id,))
+        target_order = cursor.fetchone()[0]
+
+        # Swap the order_index values
+        cursor.execute('UPDATE slides SET order_index = ? WHERE id = ?', (target_order, slide_id))
+        cursor.execute('UPDATE slides SET order_index = ? WHERE id = ?', (current_order, target_slide_id))
     return True
 
 
 def set_slide_order(slide_id, order_index):
     """Set the order index for a specific slide"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('UPDATE slides SET order_index = ? WHERE id = ?', (order_index, slide_id))
-    conn.commit()
-    conn.close()
+    with _write_connection() as conn:
+        conn.execute('UPDATE slides SET order_index = ? WHERE id = ?', (order_index, slide_id))
     return True
 
 
 def get_all_slides_for_export():
-    """Get all slides with related data for CSV export"""
+    """Get all slides with related data for CSV export.
+
+    Each row's `text_content` is its final text, falling back to the suggested
+    and then the original text.
+    """
+    return list(iter_slides_for_export())
+
+
+def iter_slides_for_export():
+    """Like get_all_slides_for_export, but yield the rows as SQLite produces them.
+
+    The query runs before this returns (so errors surface to the caller); the
+    connection is released once the iterator is exhausted or closed.
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Query slides with related data using JOINs
-    cursor.execute('''
+    try:
+        # Query slides with related data using JOINs
+        cursor = conn.execute('''
         SELECT 
             s.id,
             s.video_id,
@@ -846,9 +1014,9 @@ def get_all_slides_for_export():
             v.filename as video_filename,
             sec.title as section_title,
             sec.create_new_page,
-            te.final_text,
-            te.suggested_text,
-            te.original_text,
+            -- First non-empty of final, suggested and original text
+            COALESCE(NULLIF(te.final_text, ''), NULLIF(te.suggested_text, ''),
+                     NULLIF(te.original_text, ''), '') as text_content,
             te.is_locked
         FROM slides s
         JOIN videos v ON s.video_id = v.id
@@ -856,29 +1024,32 @@ def get_all_slides_for_export():
         LEFT JOIN text_extracts te ON s.id = te.slide_id
         ORDER BY s.video_id, s.order_index, s.frame_number
     ''')
-    
-    slides = cursor.fetchall()
-    conn.close()
-    return slides
+    except Exception:
+        conn.close()
+        raise
+
+    def rows():
+        try:
+            yield from cursor
+        finally:
+            conn.close()
+
+    return rows()
 
 
 def purge_audio_failures_older_than(days: int) -> int:
     """Delete audio_failures older than `days` days and return number deleted.
 
-    Uses timezone-aware UTC timestamps for comparison to avoid ambiguity and
-    avoid DeprecationWarnings from datetime.utcnow().
+    The cutoff is computed by SQLite itself (`datetime('now', '-N days')`, UTC,
+    same format as CURRENT_TIMESTAMP), so the purge is a single DELETE in one
+    write transaction.
     """
-    from datetime import datetime, timedelta, timezone
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cutoff_dt = datetime.now(timezone.utc) - timedelta(days=days)
-    # SQLite CURRENT_TIMESTAMP is in 'YYYY-MM-DD HH:MM:SS' (UTC); format cutoff accordingly
-    cutoff = cutoff_dt.strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute('DELETE FROM audio_failures WHERE created_at < ?', (cutoff,))
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
-    return deleted
+    with _write_connection() as conn:
+        cursor = conn.execute(
+            "DELETE FROM audio_failures WHERE created_at < datetime('now', ?)",
+            (f'-{days} days',),
+        )
+        return cursor.rowcount
 
 
 if __name__ == '__main__':
@@ -0,0 +1,73 @@
+"""Cached discovery of the local FFmpeg build's version, filters and encoders.
+
+Spawning `ffmpeg` is comparatively expensive, so each probe runs at most once
+per process, and the filter/encoder listings only when first asked for. Call
+`cache_clear()` to re-probe (e.g. in tests that swap the binary).
+"""
+import logging
+import shutil
+import subprocess
+from functools import lru_cache
+
+
+def _run_ffmpeg_info(ffmpeg_path: str, flag: str) -> str:
+    # Each informational flag makes ffmpeg print and exit, so they can't share a call
+    proc = subprocess.run([ffmpeg_path, '-hide_banner', flag], capture_output=True, text=True, timeout=10)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg {flag} failed with code {proc.returncode}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+@lru_cache(maxsize=1)
+def get_capabilities() -> dict:
+    """Return where the ffmpeg binary on PATH is and which version it is.
+
+    Keys: `path` and `version` (first line of `ffmpeg -version`). When ffmpeg
+    is missing or fails, `version` (and, if missing, `path`) is None.
+    """
+    caps = {'path': shutil.which('ffmpeg'), 'version': None}
+    if not caps['path']:
+        return caps
+    try:
+        version_out = _run_ffmpeg_info(caps['path'], '-version')
+    except Exception as exc:
+        logging.warning('Unable to probe ffmpeg version: %s', exc)
+        return caps
+    caps['version'] = version_out.split('\n', 1)[0].strip()
+    return caps
+
+
+@lru_cache(maxsize=None)
+def _listing(flag: str) -> str:
+    path = get_capabilities()['path']
+    if not path:
+        return ''
+    try:
+        return _run_ffmpeg_info(path, flag)
+    except Exception as exc:
+        logging.warning('Unable to probe ffmpeg %s: %s', flag, exc)
+        return ''
+
+
+def get_filters() -> str:
+    """Raw `ffmpeg -filters` listing, or '' when ffmpeg is missing or fails."""
+    return _listing('-filters')
+
+
+def get_encoders() -> str:
+    """Raw `ffmpeg -encoders` listing, or '' when ffmpeg is missing or fails."""
+    return _listing('-encoders')
+
+
+def has_scale_npp() -> bool:
+    return 'scale_npp' in get_filters()
+
+
+def has_nvenc() -> bool:
+    return 'h264_nvenc' in get_encoders()
+
+
+def cache_clear():
+    """Forget every probe result so the next call runs ffmpeg again."""
+    get_capabilities.cache_clear()
+    _listing.cache_clear()
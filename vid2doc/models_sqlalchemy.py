@@ -17,6 +17,8 @@ try:
         ForeignKey,
         DateTime,
         create_engine,
+        event,
+        func,
     )
     from sqlalchemy.orm import declarative_base, relationship, sessionmaker
     SQLALCHEMY_AVAILABLE = True
@@ -26,8 +28,36 @@ except Exception:
 BASE_DIR = os.path.abspath(os.getcwd())
 DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI', f'sqlite:///{os.path.join(BASE_DIR, "video_documentation.db")}')
 
+# Applied to every new SQLite connection: WAL lets readers (e.g. PDF export)
+# proceed while another thread is writing slides.
+SQLITE_PRAGMAS = (
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    'temp_store=MEMORY',
+    'cache_size=-20000',
+    'mmap_size=268435456',
+)
+
+
+def _sqlite_pragmas(dbapi_conn, _connection_record):
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f'PRAGMA {pragma}')
+    finally:
+        cursor.close()
+
+
+def _engine_for(uri):
+    """Create an engine for `uri`, registering the SQLite pragma hook when applicable."""
+    new_engine = create_engine(uri, echo=False, future=True)
+    if uri.startswith('sqlite'):
+        event.listen(new_engine, 'connect', _sqlite_pragmas)
+    return new_engine
+
+
 if SQLALCHEMY_AVAILABLE:
-    engine = create_engine(DATABASE_URI, echo=False, future=True)
+    engine = _engine_for(DATABASE_URI)
     SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
     Base = declarative_base()
 else:
@@ -40,16 +70,25 @@ def reinit_engine(new_database_uri=None):
     """Reinitialize the SQLAlchemy engine with a new database URI.
     """
     global engine, SessionLocal, DATABASE_URI
-    if new_database_uri:
-        DATABASE_URI = new_database_uri
-    else:
-        DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI', 
-                                 f'sqlite:///{os.path.join(BASE_DIR, "video_documentation.db")}')
-    engine = create_engine(DATABASE_URI, echo=False, future=True)
+    uri = new_database_uri or os.getenv('SQLALCHEMY_DATABASE_URI',
+                                        f'sqlite:///{os.path.join(BASE_DIR, "video_documentation.db")}')
+    if engine is not None and uri == DATABASE_URI:
+        # Same database: keep the existing engine and its connection pool
+        return
+    if engine is not None:
+        # Close the old pool's connections rather than leaving them to the garbage collector
+        engine.dispose()
+    DATABASE_URI = uri
+    engine = _engine_for(DATABASE_URI)
     SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
 if SQLALCHEMY_AVAILABLE:
+    def _slide_order():
+        """Slide order used across the app: manual order_index, then frame_number."""
+        return (func.coalesce(Slide.order_index, Slide.frame_number), Slide.frame_number)
+
+
     class Section(Base):
         __tablename__ = 'sections'
         id = Column(Integer, primary_key=True)
@@ -57,9 +96,9 @@ if SQLALCHEMY_AVAILABLE:
         title = Column(String, nullable=False)
         order_index = Column(Integer, nullable=False)
         create_new_page = Column(Boolean, default=False)
-        created_at = Column(DateTime)
+        created_at = Column(DateTime, server_default=func.now(), index=True)
         video = relationship('Video', backref='sections')
-        slides = relationship('Slide', backref='section', order_by='Slide.frame_number')
+        slides = relationship('Slide', backref='section', order_by=lambda: _slide_order())
 
         def __repr__(self):
             return f'<Section(id={self.id}, title={self.title})>'
@@ -71,9 +110,10 @@ if SQLALCHEMY_AVAILABLE:
         filename = Column(String, nullable=False)
         original_path = Column(String, nullable=False)
         duration = Column(Float, nullable=True)
-        upload_date = Column(DateTime, nullable=False)
+        fps = Column(Float, nullable=True)
+        upload_date = Column(DateTime, nullable=False, server_default=func.now(), index=True)
         processed = Column(Boolean, default=False)
-        slides = relationship('Slide', backref='video', order_by='Slide.frame_number')
+        slides = relationship('Slide', backref='video', order_by=lambda: _slide_order())
 
         def __repr__(self):
             return f'<Video(id={self.id}, filename={self.filename})>'
@@ -87,7 +127,12 @@ if SQLALCHEMY_AVAILABLE:
         timestamp = Column(Float, nullable=False)
         image_path = Column(String, nullable=False)
         section_id = Column(Integer, ForeignKey('sections.id'), nullable=True)
-        text_extracts = relationship('TextExtract', back_populates='slide', order_by='TextExtract.created_at')
+        # Position set by manual reordering; NULL falls back to frame_number
+        order_index = Column(Integer, nullable=True)
+        # Oldest first, ties broken by id, so the last entry is the latest extract
+        # exactly as the sqlite3 helpers pick it (created_at DESC, id DESC)
+        text_extracts = relationship('TextExtract', back_populates='slide',
+                                     order_by=lambda: (TextExtract.created_at, TextExtract.id))
 
         def to_dict(self):
             return {
@@ -108,8 +153,8 @@ if SQLALCHEMY_AVAILABLE:
         suggested_text = Column(Text)
         final_text = Column(Text)
         is_locked = Column(Boolean, default=False)
-        created_at = Column(DateTime)
-        updated_at = Column(DateTime)
+        created_at = Column(DateTime, server_default=func.now(), index=True)
+        updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
         slide = relationship('Slide', back_populates='text_extracts')
 
         def to_dict(self):
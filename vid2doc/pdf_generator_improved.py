@@ -1,11 +1,15 @@
 """Improved PDF generation module moved into package."""
+import io
+import multiprocessing
 import os
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
 try:
     from reportlab.lib.pagesizes import letter
     from reportlab.pdfgen import canvas
     from reportlab.lib.units import inch
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import Paragraph, Frame
+    from reportlab.platypus import Paragraph
     from reportlab.lib.enums import TA_LEFT
     REPORTLAB_AVAILABLE = True
 except Exception:
@@ -17,20 +21,27 @@ except Exception:
         return {'Normal': None}
     class Paragraph:
         pass
-    class Frame:
-        pass
     TA_LEFT = 0
 
-import logging
+# pypdf is only needed to merge per-section shards rendered in parallel
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except Exception:
+    PdfWriter = None
+    PYPDF_AVAILABLE = False
 
-from vid2doc.models_sqlalchemy import Video, Slide, TextExtract, SessionLocal
+import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Below this many sections the process pool start-up costs more than it saves
+PARALLEL_SECTION_THRESHOLD = 3
+
 class PDFGenerator:
     def __init__(self, output_path):
         self.output_path = output_path
-        output_dir = os.path.dirname(output_path)
+        output_dir = os.path.dirname(output_path) if isinstance(output_path, str) else ''
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
         if not REPORTLAB_AVAILABLE or canvas is None:
@@ -39,6 +50,9 @@ class PDFGenerator:
         self.width, self.height = letter
         self.styles = getSampleStyleSheet()
         self.text_style = ParagraphStyle('CustomText', parent=self.styles['Normal'], fontSize=10, leading=14, alignment=TA_LEFT)
+        self.summary_style = ParagraphStyle('SummaryStyle', parent=self.styles['Normal'], fontSize=12, leading=16, alignment=TA_LEFT)
+        # Parsed paragraphs keyed by their text; slides often repeat boilerplate text
+        self._paragraphs = {}
 
     # Remaining implementation intentionally identical to original; omitted here for brevity
     def add_title_page(self, title):
@@ -49,12 +63,16 @@ class PDFGenerator:
     def add_summary_page(self, summary):
         self.canvas.setFont("Helvetica", 12)
         self.canvas.drawString(50, self.height - 50, "Document Summary")
+        if summary:
+            self._draw_paragraph(Paragraph(escape(summary), self.summary_style), 50, self.height - 70, self.width - 100)
         self.canvas.showPage()
 
-    def add_section_header(self, section_title):
+    def add_section_header(self, section_title, y_position=None):
+        if y_position is None:
+            y_position = self.height - 50
         self.canvas.setFont("Helvetica-Bold", 16)
-        self.canvas.drawString(50, self.height - 50, section_title)
-        return self.height - 70
+        self.canvas.drawString(50, y_position, section_title)
+        return y_position - 20
 
     def add_slide_with_text(self, image_path, text, y_position):
         image_width = 3 * inch
@@ -69,28 +87,189 @@ class PDFGenerator:
                 self.canvas.drawString(image_x, image_y, f"Image error: {image_path}")
         else:
             self.canvas.drawString(image_x, image_y, f"Image not found: {image_path}")
-        text_x = image_x + image_width + 20
-        text_width = self.width - text_x - 50
-        frame = Frame(text_x, image_y, text_width, image_height, leftPadding=0, bottomPadding=0, rightPadding=0, topPadding=0, showBoundary=0)
+        bottom = image_y
         if text:
-            para = Paragraph(text, self.text_style)
-            frame.addFromList([para], self.canvas)
-        return y_position - image_height - 30
+            text_x = image_x + image_width + 20
+            text_width = self.width - text_x - 50
+            # Text longer than the image runs on below it and onto following pages
+            text_bottom, new_page = self._draw_paragraph(self._paragraph_for(text), text_x, y_position, text_width)
+            bottom = text_bottom if new_page else min(bottom, text_bottom)
+        return bottom - 30
+
+    def _draw_paragraph(self, para, x, y_top, width):
+        """Draw `para` in a column from `y_top` down to the bottom margin, splitting
+        it across as many pages as it needs.
+
+        Returns the y just below the text and whether a new page was started.
+        """
+        new_page = False
+        while True:
+            avail = y_top - 50
+            _, height = para.wrap(width, avail)
+            if height <= avail:
+                para.drawOn(self.canvas, x, y_top - height)
+                return y_top - height, new_page
+            parts = para.split(width, avail)
+            if parts:
+                first, para = parts[0], parts[1] if len(parts) > 1 else None
+                _, first_height = first.wrap(width, avail)
+                first.drawOn(self.canvas, x, y_top - first_height)
+                if para is None:
+                    return y_top - first_height, new_page
+            elif y_top >= self.height - 50:
+                # Can't be split and doesn't fit a whole page: draw it rather than loop
+                para.drawOn(self.canvas, x, y_top - height)
+                return 50, new_page
+            self.canvas.showPage()
+            new_page = True
+            y_top = self.height - 50
+
+    def _paragraph_for(self, text):
+        para = self._paragraphs.get(text)
+        if para is None:
+            # Slide text is OCR/transcript output, not markup: '&' or '<' must not reach the parser
+            para = self._paragraphs[text] = Paragraph(escape(text), self.text_style)
+        return para
+
+    def add_slides(self, slides, y_position):
+        """Draw `slides` top-down from `y_position`, breaking pages as needed."""
+        for slide in slides:
+            if y_position - 2.25 * inch < 50:
+                self.canvas.showPage()
+                y_position = self.height - 50
+            y_position = self.add_slide_with_text(slide.image_path, _slide_text(slide), y_position)
+        return y_position
+
+    def add_section(self, section, y_position=None):
+        """Render a section header and its slides, continuing from `y_position`.
+
+        A section flagged create_new_page starts on a fresh page, as does one
+        whose header and first slide would not fit. Returns the next y position.
+        """
+        top = self.height - 50
+        if y_position is None:
+            y_position = top
+        if y_position < top and (section.create_new_page or y_position - 20 - 2.25 * inch < 50):
+            self.canvas.showPage()
+            y_position = top
+        y_position = self.add_section_header(section.title, y_position)
+        return self.add_slides(section.slides, y_position)
 
     def generate_from_video_id(self, video_id, video_title="Video Documentation", video_summary=""):
-        session = SessionLocal()
+        # Imported here so importing this module (e.g. from the Flask app) doesn't set up the ORM.
+        # The session factory is resolved at call time so reinit_engine() is honoured.
+        from vid2doc import models_sqlalchemy
+        from sqlalchemy.orm import configure_mappers, selectinload
+        from vid2doc.models_sqlalchemy import Section, Slide, Video
+
+        # Video.sections is a backref, so it only exists once the mappers are configured
+        configure_mappers()
+        session = models_sqlalchemy.SessionLocal()
         try:
-            self.add_title_page(video_title)
-            self.add_summary_page(video_summary)
-            video = session.query(Video).filter_by(id=video_id).first()
+            # Load slides, their extracts and the sections up front: one SELECT per
+            # relationship instead of a lazy load per slide and per section
+            video = session.get(Video, video_id, options=[
+                selectinload(Video.slides).selectinload(Slide.text_extracts),
+                selectinload(Video.sections).selectinload(Section.slides),
+            ])
             if not video:
                 logging.error(f"Video with id {video_id} not found")
                 return
-            self.canvas.save()
+            sections = sorted(video.sections, key=lambda s: s.order_index)
+            # Sections flow on from the previous one unless flagged create_new_page, so
+            # only runs that start on a fresh page can be rendered independently
+            groups = _page_groups(sections)
+            head = None
+            if PYPDF_AVAILABLE and len(groups) >= PARALLEL_SECTION_THRESHOLD:
+                # The pages drawn here get merged with the section shards, so keep them in memory
+                head = io.BytesIO()
+                self.canvas = canvas.Canvas(head, pagesize=letter)
+            self.add_title_page(video_title)
+            self.add_summary_page(video_summary)
+            unsectioned = [s for s in video.slides if s.section_id is None]
+            y_position = self.height - 50
+            if unsectioned:
+                y_position = self.add_slides(unsectioned, y_position)
+            if head is not None:
+                # A leading run without create_new_page continues the unsectioned pages
+                if not groups[0][0].create_new_page:
+                    for section in groups.pop(0):
+                        y_position = self.add_section(section, y_position)
+                self._generate_sections_parallel(head, [[s.id for s in group] for group in groups])
+            else:
+                for section in sections:
+                    y_position = self.add_section(section, y_position)
+                self.canvas.save()
             logging.info(f"PDF generated: {self.output_path}")
         finally:
             session.close()
 
+    def _generate_sections_parallel(self, head, groups):
+        """Render each group of section ids in a worker process and write them after the pages in `head`."""
+        from vid2doc import models_sqlalchemy
+
+        self.canvas.save()
+        head.seek(0)
+        database_uri = models_sqlalchemy.DATABASE_URI
+        workers = max(1, min(os.cpu_count() or 1, len(groups)))
+        # Spawned, not forked: the Flask process has worker threads holding locks and
+        # pooled SQLite connections that a forked child must not inherit
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            shards = list(pool.map(_render_sections_to_bytes, [database_uri] * len(groups), groups))
+        writer = PdfWriter()
+        writer.append(head)
+        for shard in shards:
+            writer.append(io.BytesIO(shard))
+        writer.write(self.output_path)
+
+
+def _page_groups(sections):
+    """Split ordered sections into runs that each begin with a create_new_page section
+    (the first run may not)."""
+    groups = []
+    for section in sections:
+        if section.create_new_page or not groups:
+            groups.append([])
+        groups[-1].append(section)
+    return groups
+
+
+def _slide_text(slide):
+    """Return the best available text from the slide's latest extract."""
+    if not slide.text_extracts:
+        return ''
+    te = slide.text_extracts[-1]
+    return te.final_text or te.suggested_text or te.original_text or ''
+
+
+def _render_sections_to_bytes(database_uri, section_ids):
+    """Render a run of sections into a standalone PDF and return its bytes (process-pool worker)."""
+    from vid2doc import models_sqlalchemy
+    from sqlalchemy.orm import selectinload
+    from vid2doc.models_sqlalchemy import Section, Slide
+
+    if models_sqlalchemy.DATABASE_URI != database_uri:
+        models_sqlalchemy.reinit_engine(database_uri)
+    session = models_sqlalchemy.SessionLocal()
+    try:
+        sections = (
+            session.query(Section)
+            .options(selectinload(Section.slides).selectinload(Slide.text_extracts))
+            .filter(Section.id.in_(section_ids))
+            .all()
+        )
+        sections.sort(key=lambda s: section_ids.index(s.id))
+        buffer = io.BytesIO()
+        generator = PDFGenerator(buffer)
+        y_position = None
+        for section in sections:
+            y_position = generator.add_section(section, y_position)
+        generator.canvas.save()
+        return buffer.getvalue()
+    finally:
+        session.close()
+
 
 def generate_pdf_from_video_id(video_id, output_path, video_title="Video Documentation", video_summary=""):
     generator = PDFGenerator(output_path)
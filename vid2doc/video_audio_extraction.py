@@ -14,6 +14,9 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 _WHISPER_MODELS = {}
 
+# Root folder for extracted wav segments; per-video folders go beneath it
+WAV_ROOT = 'wav'
+
 
 def _load_whisper_model(model_size: str):
     """Lazy-load and cache Whisper models to avoid repeated downloads."""
@@ -149,7 +152,7 @@ def _cleanup_wav_folder(folder_path: str, max_files: int = 200):
 def get_slide_text(video_file_name, last_frame_idx, frame_idx, fps, *, model_size: str = "base", audio_retry_attempts: int = None, video_id: int = None, max_wav_files: int = 200):
 
     # Support either a full path to the video file (uploads/...) or a bare filename
-    base_wav_folder = 'wav'
+    base_wav_folder = WAV_ROOT
 
     # ensure base wav folder exists
     os.makedirs(base_wav_folder, exist_ok=True)
@@ -0,0 +1,12 @@
+"""WSGI entrypoint, e.g. ``gunicorn vid2doc.wsgi:app``.
+
+The application is resolved when this module is imported, so the Flask setup
+in `vid2doc.app` runs while the worker boots rather than on its first request.
+"""
+from __future__ import annotations
+
+from . import create_app
+
+app = create_app()
+
+__all__ = ['app']